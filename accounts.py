@@ -0,0 +1,214 @@
+import csv
+import json
+import os
+import uuid
+from pathlib import Path
+
+from config_store import file_lock
+
+# ---------------- CONFIG ----------------
+# Rewrite the log once it holds this many more lines than there are accounts
+COMPACT_SLACK = 1000
+CSV_FIELDS = ["username", "uuid", "online"]
+# ----------------------------------------
+
+
+def offline_uuid(username):
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, username))
+
+
+def make_account(username, online=False, account_uuid=None):
+    return {"username": username, "online": bool(online), "uuid": account_uuid or offline_uuid(username)}
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "online")
+
+
+class AccountRegistry:
+    """
+    Accounts indexed by uuid and by username, kept in a JSON lines log: every add and
+    remove appends one line, so a change never rewrites the other accounts. The log is
+    compacted (rewritten with only the live accounts) once it has COMPACT_SLACK dead lines.
+
+    Order is the order accounts were added in. Removing leaves a hole in the order list
+    that is skipped when listing and dropped on compaction, so add, remove and lookups are O(1).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self._by_uuid = {}
+        self._by_username = {}
+        self._order = []
+        self._position = {}
+        self._lines = 0
+        self.load()
+
+    def _apply(self, record):
+        op = record.get("op")
+        if op == "add":
+            self._insert(record["account"])
+        elif op == "remove":
+            self._delete(record["uuid"])
+
+    def _insert(self, account):
+        if account["uuid"] in self._by_uuid:
+            return False
+        self._by_uuid[account["uuid"]] = account
+        self._by_username.setdefault(account["username"], account["uuid"])
+        self._position[account["uuid"]] = len(self._order)
+        self._order.append(account["uuid"])
+        return True
+
+    def _delete(self, account_uuid):
+        account = self._by_uuid.pop(account_uuid, None)
+        if account is None:
+            return None
+        if self._by_username.get(account["username"]) == account_uuid:
+            del self._by_username[account["username"]]
+        self._order[self._position.pop(account_uuid)] = None
+        return account
+
+    def load(self):
+        self._by_uuid.clear()
+        self._by_username.clear()
+        self._order = []
+        self._position.clear()
+        self._lines = 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, KeyError):
+                        # A line cut short by a crash
+                        continue
+                    self._lines += 1
+        except FileNotFoundError:
+            pass
+
+    def _append(self, records):
+        if not records:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records).encode("utf-8")
+        with file_lock(self.lock_path):
+            with open(self.path, "a+b") as f:
+                # Don't glue the new lines onto one a crash cut short
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+        self._lines += len(records)
+        if self._lines > len(self._by_uuid) + COMPACT_SLACK:
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrites the log with one line per live account. Lines other processes appended
+        in the meantime are read in first, so they are kept.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.lock_path):
+            self.load()
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for account in self:
+                    f.write(json.dumps({"op": "add", "account": account}, separators=(",", ":")) + "\n")
+            os.replace(tmp, self.path)
+        self._lines = len(self._by_uuid)
+
+    def __len__(self):
+        return len(self._by_uuid)
+
+    def __iter__(self):
+        for account_uuid in self._order:
+            if account_uuid is not None:
+                yield self._by_uuid[account_uuid]
+
+    def __contains__(self, account_uuid):
+        return account_uuid in self._by_uuid
+
+    def get(self, account_uuid):
+        return self._by_uuid.get(account_uuid)
+
+    def find(self, username):
+        """
+        The first added account with this username, or None.
+        """
+        account_uuid = self._by_username.get(username)
+        return self._by_uuid[account_uuid] if account_uuid else None
+
+    def add(self, account):
+        """
+        Adds an account dict (username, online, uuid). Returns False if its uuid is already there.
+        """
+        return self.add_many([account]) == 1
+
+    def add_many(self, accounts):
+        """
+        Adds accounts with one write to the log. Returns how many were new.
+        """
+        records = []
+        for account in accounts:
+            account = make_account(account["username"], account.get("online", False), account.get("uuid"))
+            if self._insert(account):
+                records.append({"op": "add", "account": account})
+        self._append(records)
+        return len(records)
+
+    def remove(self, account_uuid):
+        """
+        Removes an account, returns it (or None if there was none with that uuid).
+        """
+        account = self._delete(account_uuid)
+        if account is not None:
+            self._append([{"op": "remove", "uuid": account_uuid}])
+        return account
+
+    def import_file(self, path):
+        """
+        Adds the accounts of a .csv (username[,uuid][,online] columns, with a header) or
+        .jsonl file (one account object per line). Missing uuids are the offline uuid of
+        the username. Returns how many were new.
+        """
+        path = Path(path)
+        accounts = []
+        with open(path, encoding="utf-8", newline="") as f:
+            if path.suffix.lower() == ".csv":
+                for row in csv.DictReader(f):
+                    if row.get("username"):
+                        accounts.append({"username": row["username"], "uuid": row.get("uuid") or None,
+                                         "online": _parse_bool(row.get("online", False))})
+            else:
+                for line in f:
+                    if line.strip():
+                        row = json.loads(line)
+                        accounts.append({"username": row["username"], "uuid": row.get("uuid"),
+                                         "online": _parse_bool(row.get("online", False))})
+        return self.add_many(accounts)
+
+    def export_file(self, path):
+        """
+        Writes every account to a .csv or .jsonl file (picked by suffix). Returns the count.
+        """
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        count = 0
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            if path.suffix.lower() == ".csv":
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+                writer.writeheader()
+                for account in self:
+                    writer.writerow(account)
+                    count += 1
+            else:
+                for account in self:
+                    f.write(json.dumps(account) + "\n")
+                    count += 1
+        os.replace(tmp, path)
+        return count
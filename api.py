@@ -0,0 +1,215 @@
+"""
+Headless API of the launcher: the same functions the menu and the command line use,
+without any prompts or prints. Importing this module is cheap; the modules doing the
+actual work (downloads, archives, process pools) are imported by the functions that need them.
+"""
+from pathlib import Path
+
+from accounts import offline_uuid
+
+# ---------------- CONFIG ----------------
+BASE_DIR = Path("mc")
+JAVA_BASE_DIR = Path("java")
+MANIFEST_URL = "https://piston-meta.mojang.com/mc/game/version_manifest.json"
+VERSION_TYPES = ("release", "snapshot", "old_beta", "old_alpha")
+# ----------------------------------------
+
+
+def account_registry(base_dir=BASE_DIR):
+    from accounts import AccountRegistry
+
+    return AccountRegistry(Path(base_dir) / "accounts.jsonl")
+
+
+def installed_versions(base_dir=BASE_DIR):
+    """
+    Ids of the versions installed under base_dir, sorted.
+    """
+    versions_dir = Path(base_dir) / "versions"
+    if not versions_dir.exists():
+        return []
+    return sorted(f.name for f in versions_dir.iterdir() if (f / f"{f.name}.json").exists())
+
+
+def list_versions(base_dir=BASE_DIR, types=VERSION_TYPES, manifest_url=MANIFEST_URL, ttl=600, offline=False):
+    """
+    Manifest entries of the given types, newest first. Raises OSError without a manifest.
+    """
+    from manifest import load_manifest_index
+
+    index = load_manifest_index(Path(base_dir) / "cache", manifest_url, ttl=ttl, offline=offline)
+    if index is None:
+        raise OSError("Unable to fetch the version manifest")
+    return index.filtered(types)
+
+
+def install_version(version_id, base_dir=BASE_DIR, manifest_url=MANIFEST_URL, workers=16, segments=4,
+                    ttl=600, offline=False, features=None):
+    """
+    Installs a version, see installer.install for the returned report.
+    """
+    from installer import install
+
+    return install(version_id, Path(base_dir), manifest_url=manifest_url, workers=workers, segments=segments,
+                   ttl=ttl, offline=offline, features=features)
+
+
+def install_versions(version_ids, base_dir=BASE_DIR, manifest_url=MANIFEST_URL, workers=16, segments=4,
+                     ttl=600, offline=False, features=None):
+    """
+    Installs several versions, downloading what they share once, see installer.install_many
+    for the returned report.
+    """
+    from installer import install_many
+
+    return install_many(version_ids, Path(base_dir), manifest_url=manifest_url, workers=workers,
+                        segments=segments, ttl=ttl, offline=offline, features=features)
+
+
+def repair(version_ids, base_dir=BASE_DIR, manifest_url=MANIFEST_URL, workers=16, segments=4,
+           ttl=600, offline=False, features=None):
+    """
+    Re-fetches only the missing or corrupt files of installed versions, see repair.repair
+    for the returned report.
+    """
+    from repair import repair
+
+    return repair(version_ids, Path(base_dir), manifest_url=manifest_url, workers=workers, segments=segments,
+                  ttl=ttl, offline=offline, features=features)
+
+
+def verify(base_dir=BASE_DIR, workers=None):
+    """
+    Hashes every installed file, see verify.verify_installation for the returned report.
+    """
+    from verify import verify_installation
+
+    return verify_installation(Path(base_dir), workers)
+
+
+def gc(base_dir=BASE_DIR, dry_run=False):
+    """
+    Removes the assets, libraries and store blobs no installed version uses anymore,
+    see cleanup.sweep for the returned report.
+    """
+    from cleanup import sweep
+
+    return sweep(Path(base_dir), dry_run=dry_run)
+
+
+def delete_version(version_id, base_dir=BASE_DIR, dry_run=False):
+    """
+    Deletes an installed version and what only it used, see cleanup.delete_version.
+    """
+    from cleanup import delete_version
+
+    return delete_version(Path(base_dir), version_id, dry_run=dry_run)
+
+
+def serve_cache(base_dir=BASE_DIR, bind="0.0.0.0", port=8080):
+    """
+    Serves base_dir over HTTP as a mirror for other launchers until interrupted,
+    see cache_server.
+    """
+    from cache_server import serve
+
+    serve(Path(base_dir), bind, port)
+
+
+def find_or_install_java(major, base_dir=BASE_DIR, java_base_dir=JAVA_BASE_DIR, java_cmd="java",
+                         install_missing=True, segments=4):
+    """
+    Path of a Java executable with this major version. Without one, the matching Adoptium
+    JRE is installed into java_base_dir/runtime (unless install_missing is False).
+    Returns None when no Java could be found or installed.
+    """
+    from java_runtime import find_java, install_java_archive, java_archive_name, java_download_url
+
+    base_dir = Path(base_dir)
+    java_base_dir = Path(java_base_dir)
+    registry_path = base_dir / "java_runtimes.json"
+    roots = [java_base_dir / "runtime", base_dir / "runtime"]
+    commands = [java_cmd] if java_cmd else []
+    java_path = find_java(major, registry_path, roots, commands)
+    if java_path is None and install_missing:
+        java_base_dir.mkdir(parents=True, exist_ok=True)
+        install_java_archive(java_download_url(major), java_base_dir / "runtime",
+                             java_base_dir / java_archive_name(), segments=segments)
+        java_path = find_java(major, registry_path, roots, commands)
+    return java_path
+
+
+def launch_command(version_id, username, base_dir=BASE_DIR, java_path=None, user_uuid=None, access_token="0",
+                   max_ram=None, features=None, argfile=True, cds=False, java_cmd="java", install_java=True,
+                   game_dir=None):
+    """
+    Builds the command that starts version_id as username.
+    game_dir is where the game keeps saves, options and logs (default: base_dir); the
+    version, libraries and assets are always read from base_dir. Every path in the
+    command is absolute, as the game may run with game_dir as its working directory.
+    Raises FileNotFoundError when the version, its files or a fitting Java is missing.
+    """
+    import json
+    import os
+
+    from launch import apply_jvm_speedups, build_launch_command, prepare_launch
+
+    base_dir = Path(base_dir).resolve()
+    game_dir = Path(game_dir).resolve() if game_dir else base_dir
+    features = features or {}
+    version_folder = base_dir / "versions" / version_id
+    json_path = version_folder / f"{version_id}.json"
+    if not json_path.exists():
+        raise FileNotFoundError(f"Version {version_id} is not installed")
+    with open(json_path, encoding="utf-8") as f:
+        json_data = json.load(f)
+
+    launch_manifest, missing = prepare_launch(version_folder, json_data, base_dir / "libraries", features)
+    if missing:
+        raise FileNotFoundError(f"{len(missing)} file(s) of {version_id} are missing, first: {missing[0]}")
+
+    java_major = json_data.get("javaVersion", {}).get("majorVersion", 8)
+    if java_path is None:
+        java_path = find_or_install_java(java_major, base_dir, java_cmd=java_cmd, install_missing=install_java)
+        if java_path is None:
+            raise FileNotFoundError(f"No Java {java_major} found")
+    if os.path.dirname(java_path):
+        # A path (as opposed to a command looked up on PATH)
+        java_path = os.path.abspath(java_path)
+
+    variables = {
+        "auth_player_name": username,
+        "auth_uuid": user_uuid or offline_uuid(username),
+        "auth_access_token": access_token,
+        "version_name": json_data["id"],
+        "version_type": json_data["type"],
+        "game_directory": game_dir,
+        "assets_root": base_dir / "assets",
+        "assets_index_name": json_data.get("assetIndex", {}).get("id", ""),
+        "classpath": os.pathsep.join(launch_manifest["classpath"]),
+        "natives_directory": launch_manifest["natives_directory"],
+        "launcher_name": "Python Minecraft Launcher",
+        "launcher_version": "1.0",
+        "resolution_width": features.get("resolution_width", ""),
+        "resolution_height": features.get("resolution_height", ""),
+        "quickPlayPath": features.get("quick_play_path", ""),
+        "quickPlaySingleplayer": features.get("quick_play_singleplayer", ""),
+        "quickPlayMultiplayer": features.get("quick_play_multiplayer", ""),
+        "quickPlayRealms": features.get("quick_play_realms", ""),
+    }
+    cmd = build_launch_command(java_path, json_path, variables, features)
+    if max_ram:
+        cmd.insert(1, f"-Xmx{max_ram}")
+    return apply_jvm_speedups(cmd, version_folder, java_major, argfile=argfile, cds=cds)
+
+
+def launch(version_id, username, base_dir=BASE_DIR, wait=True, **kwargs):
+    """
+    Starts version_id as username (kwargs as in launch_command).
+    Returns the game's exit code, or the running Popen when wait is False.
+    """
+    import subprocess
+
+    cmd = launch_command(version_id, username, base_dir, **kwargs)
+    proc = subprocess.Popen(cmd)
+    return proc.wait() if wait else proc
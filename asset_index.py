@@ -0,0 +1,137 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+# ---------------- CONFIG ----------------
+MAGIC = b"PMLAIDX1"
+# magic, entry count, name table bytes, mtime_ns and size of the JSON it was built from
+HEADER = struct.Struct("<8sIIQQ")
+# ----------------------------------------
+
+# Layout after the header, all little endian, in asset index order:
+#   count * 20 bytes   SHA-1 of every object, packed
+#   count * u64        sizes
+#   (count + 1) * u32  offsets of the names in the name table
+#   name table         UTF-8 names, back to back
+
+
+class AssetIndex:
+    """
+    An asset index as flat arrays (hashes, sizes, names) instead of a dict of dicts.
+    Built from the JSON with build(), or mapped from its binary form with open().
+    """
+
+    def __init__(self, hashes, sizes, offsets, names, keep=None):
+        self._hashes = hashes  # bytes-like, 20 bytes per entry
+        self.sizes = sizes  # sequence of ints
+        self._offsets = offsets
+        self._names = names
+        self._keep = keep  # the mmap the views point into
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def hashes(self):
+        """
+        Every object hash as a hex string, in index order.
+        """
+        hexed = self._hashes.hex()
+        return [hexed[i:i + 40] for i in range(0, len(hexed), 40)]
+
+    def name(self, i):
+        return bytes(self._names[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+
+    def names(self):
+        return [self.name(i) for i in range(len(self))]
+
+    def as_objects(self):
+        """
+        The JSON "objects" dict again ({name: {"hash": ..., "size": ...}}).
+        """
+        return {self.name(i): {"hash": h, "size": s} for i, (h, s) in enumerate(zip(self.hashes(), self.sizes))}
+
+    @classmethod
+    def build(cls, objects):
+        hashes = bytearray()
+        sizes = array("Q")
+        offsets = array("I", [0])
+        names = bytearray()
+        for asset_name, asset_data in objects.items():
+            hashes += bytes.fromhex(asset_data["hash"])
+            sizes.append(asset_data.get("size") or 0)
+            names += asset_name.encode("utf-8")
+            offsets.append(len(names))
+        return cls(bytes(hashes), sizes, offsets, bytes(names))
+
+    def to_bytes(self, stamp):
+        sizes = array("Q", self.sizes)
+        offsets = array("I", self._offsets)
+        if sizes.itemsize != 8 or offsets.itemsize != 4:
+            raise ValueError("Unsupported platform array sizes")
+        if sys.byteorder != "little":
+            sizes.byteswap()
+            offsets.byteswap()
+        header = HEADER.pack(MAGIC, len(self), len(self._names), *stamp)
+        return b"".join([header, bytes(self._hashes), sizes.tobytes(), offsets.tobytes(), bytes(self._names)])
+
+    @classmethod
+    def open(cls, path, stamp=None):
+        """
+        Maps a binary index. Returns None if it is missing, damaged, or (with stamp)
+        was built from a different JSON.
+        """
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, count, names_len, mtime_ns, size = HEADER.unpack_from(mapped)
+        except struct.error:
+            magic = None
+        if (magic != MAGIC or sys.byteorder != "little"
+                or HEADER.size + count * 32 + 4 + names_len != len(mapped)
+                or (stamp is not None and [mtime_ns, size] != list(stamp))):
+            mapped.close()
+            return None
+        view = memoryview(mapped)
+        pos = HEADER.size
+        hashes = view[pos:pos + count * 20]
+        pos += count * 20
+        sizes = view[pos:pos + count * 8].cast("Q")
+        pos += count * 8
+        offsets = view[pos:pos + (count + 1) * 4].cast("I")
+        pos += (count + 1) * 4
+        return cls(hashes, sizes, offsets, view[pos:], keep=mapped)
+
+
+def load_asset_index(index_path, cache_dir):
+    """
+    Loads the asset index JSON at index_path through its binary copy in cache_dir
+    (<id>.bin), which is (re)built whenever the JSON's mtime or size differs from the
+    ones it was made from.
+    """
+    index_path = Path(index_path)
+    st = index_path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    bin_path = Path(cache_dir) / f"{index_path.stem}.bin"
+    index = AssetIndex.open(bin_path, stamp)
+    if index is not None:
+        return index
+
+    with open(index_path, encoding="utf-8") as f:
+        index = AssetIndex.build(json.load(f)["objects"])
+    try:
+        bin_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = bin_path.with_name(f".{bin_path.name}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(index.to_bytes(stamp))
+        os.replace(tmp, bin_path)
+    except OSError:
+        # Read-only cache, or (Windows) the old copy is still mapped somewhere
+        pass
+    return index
@@ -0,0 +1,74 @@
+"""
+Loading an asset index and walking every (hash, size): json.load of the index against
+its memory-mapped binary copy.
+
+    python bench/bench_asset_index.py [--objects 5000 50000]
+"""
+import argparse
+import hashlib
+import json
+import shutil
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from common import best_of, report
+
+from asset_index import load_asset_index
+
+
+def write_index(path, count):
+    objects = {}
+    for i in range(count):
+        objects[f"minecraft/sounds/block/sample_{i}.ogg"] = {"hash": hashlib.sha1(str(i).encode()).hexdigest(),
+                                                             "size": 1000 + i}
+    path.write_text(json.dumps({"objects": objects}), encoding="utf-8")
+
+
+def walk_json(index_path):
+    with open(index_path, encoding="utf-8") as f:
+        objects = json.load(f)["objects"]
+    return sum(1 for asset in objects.values() if asset["hash"] and asset["size"] is not None)
+
+
+def walk_binary(index_path, cache_dir):
+    index = load_asset_index(index_path, cache_dir)
+    return sum(1 for h, size in zip(index.hashes(), index.sizes) if h and size is not None)
+
+
+def heap_after(fn):
+    tracemalloc.start()
+    kept = fn()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, nargs="+", default=[5000, 50_000])
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="pml-bench-"))
+    try:
+        for count in args.objects:
+            index_path = root / f"{count}.json"
+            cache_dir = root / "cache"
+            write_index(index_path, count)
+            assert walk_binary(index_path, cache_dir) == walk_json(index_path) == count
+            size = index_path.stat().st_size / 1024 / 1024
+            report(f"{count} objects ({size:.1f} MB), json", best_of(lambda: walk_json(index_path), args.repeat))
+            report(f"{count} objects ({size:.1f} MB), binary",
+                   best_of(lambda: walk_binary(index_path, cache_dir), args.repeat))
+            json_heap = heap_after(lambda: json.loads(index_path.read_text(encoding="utf-8")))
+            binary_heap = heap_after(lambda: load_asset_index(index_path, cache_dir))
+            print(f"  heap held by the loaded index: json {json_heap / 1024 / 1024:.1f} MB,"
+                  f" binary {binary_heap / 1024 / 1024:.2f} MB")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+End-to-end install of one version from a local mock Mojang with a per-request delay,
+on one worker against a shared pool, then a re-run with everything present.
+
+    python bench/bench_install.py [--assets 1000] [--delay 0.005] [--workers 16]
+"""
+import argparse
+import contextlib
+import io
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from common import report
+from mock_mojang import serve
+
+from installer import install
+
+
+def timed_install(base_dir, base, workers):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = install("1.0", base_dir, manifest_url=f"{base}/manifest.json", workers=workers,
+                         assets_base_url=f"{base}/res")
+    if result["failures"]:
+        raise SystemExit(f"{len(result['failures'])} downloads failed")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=1000)
+    parser.add_argument("--libraries", type=int, default=30)
+    parser.add_argument("--delay", type=float, default=0.005, help="seconds per request")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    server, base = serve(["1.0"], delay=args.delay, assets=args.assets, libraries=args.libraries)
+    root = Path(tempfile.mkdtemp(prefix="pml-bench-"))
+    try:
+        report("install, workers=1", timed_install(root / "one", base, 1))
+        report(f"install, workers={args.workers}", timed_install(root / "pool", base, args.workers))
+        report("re-run, all present", timed_install(root / "pool", base, args.workers))
+    finally:
+        server.shutdown()
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+A visit to the install menu: the old json.load of the cached manifest plus loops over it,
+against load_manifest_index and its filtered() list.
+
+    python bench/bench_manifest_index.py [--versions 900]
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from common import best_of, report
+
+import manifest
+from manifest import load_manifest_index
+
+TYPES = ("release", "snapshot", "old_beta", "old_alpha")
+URL = "https://example.invalid/version_manifest.json"
+
+
+def synthetic_manifest(count):
+    versions = []
+    for i in range(count):
+        versions.append({"id": f"v{i}", "type": TYPES[i % 7 % 4], "url": f"https://example.invalid/{i}.json",
+                         "time": f"{2010 + i // 365}-01-01T00:00:{i % 60:02d}+00:00",
+                         "releaseTime": f"{2010 + i // 365:04d}-{i % 12 + 1:02d}-{i % 28 + 1:02d}T00:00:00+00:00",
+                         "sha1": "0" * 40})
+    return {"latest": {}, "versions": versions}
+
+
+def old_filter_and_lookup(manifest, display, pick):
+    # What the menu did on every visit: an if/elif chain per version, then a counter scan
+    filtered_list = []
+    c = 0
+    for i in manifest["versions"]:
+        if i["type"] == "release" and display["release"]:
+            filtered_list.append(i)
+            c += 1
+        elif i["type"] == "snapshot" and display["snapshot"]:
+            filtered_list.append(i)
+            c += 1
+        elif i["type"] == "old_beta" and display["old_beta"]:
+            filtered_list.append(i)
+            c += 1
+        elif i["type"] == "old_alpha" and display["old_alpha"]:
+            filtered_list.append(i)
+            c += 1
+    version = None
+    c = 0
+    for i in filtered_list:
+        if pick == c:
+            version = i
+        c += 1
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--versions", type=int, default=900)
+    args = parser.parse_args()
+
+    raw = json.dumps(synthetic_manifest(args.versions))
+    display = {"release": True, "snapshot": False, "old_beta": True, "old_alpha": True}
+    types = [t for t, shown in display.items() if shown]
+    pick = 10
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        manifest_path = cache_dir / "version_manifest.json"
+        manifest_path.write_text(raw, encoding="utf-8")
+        (cache_dir / "version_manifest.meta.json").write_text(
+            json.dumps({"url": URL, "fetched_at": time.time()}), encoding="utf-8")
+        index_path = cache_dir / "version_manifest.index.json"
+
+        def old_visit():
+            with open(manifest_path, encoding="utf-8") as f:
+                return old_filter_and_lookup(json.load(f), display, pick)
+
+        def visit():
+            return load_manifest_index(cache_dir, URL).filtered(types)[pick]
+
+        def first_visit():
+            manifest._loaded.clear()
+            return visit()
+
+        def first_visit_rebuilt():
+            index_path.unlink(missing_ok=True)
+            return first_visit()
+
+        report("visit, old json.load + loops", best_of(old_visit, number=50))
+        report("visit, load_manifest_index", best_of(visit, number=50))
+        report("first visit, persisted index", best_of(first_visit, number=20))
+        report("first visit, index rebuilt", best_of(first_visit_rebuilt, number=20))
+
+
+if __name__ == "__main__":
+    main()
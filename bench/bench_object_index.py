@@ -0,0 +1,67 @@
+"""
+Finding the missing assets of an index: a stat() per object against one parallel
+listing of the object store, with and without sizes, and the persisted index.
+
+    python bench/bench_object_index.py [--objects 50000] [--missing 0.02]
+"""
+import argparse
+import hashlib
+import shutil
+import tempfile
+from pathlib import Path
+
+from common import best_of, report
+
+from downloader import missing_objects
+from object_index import load_object_index, scan_objects
+
+
+def build_store(objects_dir, count, missing):
+    """
+    Writes count small objects and returns wanted ({hash: (label, size)}) with `missing`
+    of them left out of the store.
+    """
+    wanted = {}
+    skip = int(1 / missing) if missing else 0
+    for i in range(count):
+        data = str(i).encode() * 8
+        h = hashlib.sha1(data).hexdigest()
+        wanted[h] = (f"minecraft/{i}", len(data))
+        if skip and i % skip == 0:
+            continue
+        path = objects_dir / h[:2] / h
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return wanted
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=50_000)
+    parser.add_argument("--missing", type=float, default=0.02, help="fraction of the objects not on disk")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="pml-bench-"))
+    objects_dir = root / "objects"
+    index_path = root / "objects.index.json"
+    try:
+        wanted = build_store(objects_dir, args.objects, args.missing)
+        expected = len(missing_objects(wanted, objects_dir))
+        load_object_index(objects_dir, index_path)  # warm the persisted index
+
+        def check(present):
+            assert len(missing_objects(wanted, objects_dir, present)) == expected
+
+        report("stat per object", best_of(lambda: missing_objects(wanted, objects_dir), args.repeat))
+        report("parallel scandir", best_of(lambda: check(scan_objects(objects_dir)), args.repeat))
+        report("parallel scandir + sizes", best_of(lambda: check(scan_objects(objects_dir, sizes=True)), args.repeat))
+        report("persisted index (sizes)", best_of(lambda: check(load_object_index(objects_dir, index_path)),
+                                                  args.repeat))
+        print(f"{args.objects} objects, {expected} missing")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def best_of(fn, repeat=5, number=1):
+    """
+    Best wall time of `repeat` runs of `number` calls of fn, in seconds per call.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def report(label, seconds):
+    unit, scale = ("ms", 1e3) if seconds >= 1e-3 else ("us", 1e6)
+    print(f"{label:<32} {seconds * scale:9.1f} {unit}")
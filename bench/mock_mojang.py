@@ -0,0 +1,84 @@
+"""
+A local stand-in for the Mojang servers, for the install benchmarks: a version manifest,
+version JSONs, asset indexes, assets, libraries and client jars, served over HTTP with a
+fixed delay per request.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def build_files(base, version_ids, assets=1000, libraries=30, jar_size=3_000_000, shared=1.0):
+    """
+    {path: bytes} of a mock Mojang, whose URLs point at base. The versions share
+    `shared` of their assets and all of their libraries.
+    """
+    files = {}
+    common = [os.urandom(500) for _ in range(int(assets * shared))]
+    versions = []
+    for n, version_id in enumerate(version_ids):
+        objects = {}
+        for i, data in enumerate(common + [os.urandom(500) for _ in range(assets - len(common))]):
+            h = _sha1(data)
+            files[f"/res/{h[:2]}/{h}"] = data
+            objects[f"minecraft/{i}"] = {"hash": h, "size": len(data)}
+        index = json.dumps({"objects": objects}).encode()
+        files[f"/idx/{version_id}.json"] = index
+        libs = []
+        for i in range(libraries):
+            data = f"library {i}".encode() * 200
+            path = f"org/example/l{i}/1.0/l{i}-1.0.jar"
+            files[f"/lib/{path}"] = data
+            libs.append({"name": f"org.example:l{i}:1.0", "downloads": {"artifact": {
+                "path": path, "url": f"{base}/lib/{path}", "sha1": _sha1(data), "size": len(data)}}})
+        jar = os.urandom(jar_size)
+        files[f"/client/{version_id}.jar"] = jar
+        version_json = json.dumps({
+            "id": version_id, "type": "release", "mainClass": "net.minecraft.client.main.Main",
+            "assetIndex": {"id": version_id, "url": f"{base}/idx/{version_id}.json", "sha1": _sha1(index),
+                           "size": len(index)},
+            "downloads": {"client": {"url": f"{base}/client/{version_id}.jar", "sha1": _sha1(jar), "size": len(jar)}},
+            "libraries": libs,
+            "arguments": {"game": [], "jvm": ["-cp", "${classpath}"]},
+        }).encode()
+        files[f"/v/{version_id}.json"] = version_json
+        versions.append({"id": version_id, "type": "release", "url": f"{base}/v/{version_id}.json",
+                         "time": f"2020-01-{n + 1:02d}T00:00:00+00:00",
+                         "releaseTime": f"2020-01-{n + 1:02d}T00:00:00+00:00", "sha1": _sha1(version_json)})
+    files["/manifest.json"] = json.dumps({"latest": {}, "versions": versions}).encode()
+    return files
+
+
+def serve(version_ids, delay=0.005, **kwargs):
+    """
+    Starts a mock Mojang on a free port. Returns (server, base url); the manifest is
+    <base>/manifest.json and the assets are under <base>/res.
+    """
+    files = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(delay)
+            body = files.get(self.path, b"")
+            status = "200 OK" if self.path in files else "404 Not Found"
+            # Headers and body in one write, so Nagle + delayed ACK don't add 40ms per request
+            self.wfile.write(f"HTTP/1.1 {status}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    base = f"http://127.0.0.1:{server.server_port}"
+    files.update(build_files(base, version_ids, **kwargs))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, base
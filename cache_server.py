@@ -0,0 +1,126 @@
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from verify import sha1_file
+
+# ---------------- CONFIG ----------------
+DEFAULT_PORT = 8080
+COPY_SIZE = 1024 * 1024
+# ----------------------------------------
+
+# Serves an installed "mc" folder as a mirror (see mirrors.py): a request for
+# /<host>/<path> is answered from the file the launcher stored for that URL. Everything a
+# launcher downloads with a SHA-1 is checked against it, so a client can't be handed the
+# wrong file without noticing; anything not found is a 404 and the client moves on to its
+# next mirror or the original server.
+
+OBJECT_PATH = re.compile(r"^v1/objects/([0-9a-f]{40})/")
+PACKAGE_PATH = re.compile(r"^v1/packages/([0-9a-f]{40})/([^/]+)\.json$")
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def local_path(base_dir, host, path):
+    """
+    The file under base_dir that holds https://<host>/<path>, or None.
+    A file not stored under the SHA-1 the URL asks for is only returned if it has that SHA-1.
+    """
+    base_dir = Path(base_dir)
+    path = path.lstrip("/")
+    candidates = []
+    if host == "resources.download.minecraft.net":
+        candidates.append((base_dir / "assets" / "objects" / path, None))
+    elif host == "libraries.minecraft.net":
+        candidates.append((base_dir / "libraries" / path, None))
+    elif path == "mc/game/version_manifest.json":
+        candidates.append((base_dir / "cache" / "version_manifest.json", None))
+    elif match := OBJECT_PATH.match(path):
+        # Client jars (and anything else addressed by SHA-1) live in the store
+        sha1 = match.group(1)
+        candidates.append((base_dir / "store" / sha1[:2] / sha1, None))
+    elif match := PACKAGE_PATH.match(path):
+        sha1, name = match.groups()
+        candidates.append((base_dir / "cache" / "versions" / f"{name}-{sha1}.json", None))
+        # The installed index keeps its name across versions, so it may be another one
+        candidates.append((base_dir / "assets" / "indexes" / f"{name}.json", sha1))
+    root = base_dir.resolve()
+    for candidate, sha1 in candidates:
+        candidate = candidate.resolve()
+        if root in candidate.parents and candidate.is_file() and (sha1 is None or sha1_file(candidate) == sha1):
+            return candidate
+    return None
+
+
+class CacheHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    base_dir = Path("mc")
+
+    def _find(self):
+        host, _, path = self.path.split("?", 1)[0].lstrip("/").partition("/")
+        return local_path(self.base_dir, host, path) if host else None
+
+    def _headers(self, status, length, extra=()):
+        self.send_response(status)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        for key, value in extra:
+            self.send_header(key, value)
+        self.end_headers()
+
+    def _serve(self, body):
+        path = self._find()
+        if path is None:
+            self._headers(404, 0)
+            return
+        size = path.stat().st_size
+        start, end = 0, size - 1
+        status = 200
+        extra = []
+        match = RANGE.match(self.headers.get("Range", ""))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(int(match.group(2)), size - 1)
+            else:
+                start = max(0, size - int(match.group(2)))
+            if start >= size or start > end:
+                self._headers(416, 0, [("Content-Range", f"bytes */{size}")])
+                return
+            status = 206
+            extra.append(("Content-Range", f"bytes {start}-{end}/{size}"))
+        length = end - start + 1
+        self._headers(status, length, extra)
+        if not body:
+            return
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = length
+            while remaining:
+                chunk = f.read(min(COPY_SIZE, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def do_GET(self):
+        self._serve(True)
+
+    def do_HEAD(self):
+        self._serve(False)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(base_dir, bind="0.0.0.0", port=DEFAULT_PORT):
+    handler = type("Handler", (CacheHandler,), {"base_dir": Path(base_dir)})
+    return ThreadingHTTPServer((bind, port), handler)
+
+
+def serve(base_dir, bind="0.0.0.0", port=DEFAULT_PORT):
+    """
+    Serves base_dir as a mirror until interrupted.
+    """
+    with make_server(base_dir, bind, port) as server:
+        server.serve_forever()
@@ -0,0 +1,194 @@
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from object_index import scan_objects
+from store import gc_store, iter_blobs
+from verify import collect_install_files
+
+# ---------------- CONFIG ----------------
+UNLINK_WORKERS = 16
+# ----------------------------------------
+
+
+def _walk_files(root):
+    """
+    {path: size} of every file under root (dot files are downloads in progress, skipped).
+    A file hardlinked into the store gets size 0: its space is only freed with the blob,
+    which is counted under "store".
+    """
+    found = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.startswith("."):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+                found[os.path.normpath(path)] = st.st_size if st.st_nlink == 1 else 0
+            except OSError:
+                pass
+    return found
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _remove_empty_dirs(root):
+    for dirpath, _, _ in sorted(os.walk(root), key=lambda entry: len(entry[0]), reverse=True):
+        if dirpath != str(root):
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+
+
+def unreadable_versions(base_dir, exclude=()):
+    """
+    Ids of the version folders (minus exclude) without a readable <id>.json.
+    """
+    versions_dir = Path(base_dir) / "versions"
+    unknown = []
+    if not versions_dir.exists():
+        return unknown
+    for version_folder in versions_dir.iterdir():
+        if not version_folder.is_dir() or version_folder.name in exclude:
+            continue
+        try:
+            with open(version_folder / f"{version_folder.name}.json", encoding="utf-8") as f:
+                json.load(f)
+        except (OSError, ValueError):
+            unknown.append(version_folder.name)
+    return sorted(unknown)
+
+
+def find_unreachable(base_dir, exclude=()):
+    """
+    Files under base_dir (the "mc" folder) that no installed version uses anymore:
+    {"objects": {path: size}, "libraries": {...}, "indexes": {...}}.
+    Reachability comes from the installed version JSONs (minus the ids in exclude) and
+    their asset indexes. If one of those indexes is missing, which objects it needs is
+    unknown and no object is listed; if a version folder has no readable JSON, what that
+    version needs is unknown and nothing is listed at all.
+    """
+    base_dir = Path(base_dir)
+    objects_dir = base_dir / "assets" / "objects"
+    indexes_dir = base_dir / "assets" / "indexes"
+    unreachable = {"objects": {}, "libraries": {}, "indexes": {}}
+    if unreadable_versions(base_dir, exclude):
+        return unreachable
+    needed = collect_install_files(base_dir, exclude)
+    reachable = {os.path.normpath(p) for p in needed}
+    indexes_known = all(p.exists() for p in needed if p.parent == indexes_dir)
+
+    if indexes_known:
+        for asset_hash, size in scan_objects(objects_dir, sizes=True).items():
+            path = os.path.normpath(objects_dir / asset_hash[:2] / asset_hash)
+            if path not in reachable:
+                unreachable["objects"][path] = size
+    for kind, root in (("libraries", base_dir / "libraries"), ("indexes", indexes_dir)):
+        for path, size in _walk_files(root).items():
+            if path not in reachable:
+                unreachable[kind][path] = size
+    return unreachable
+
+
+def _store_freed(store_dir, paths):
+    """
+    (blobs, bytes) of the store that nothing would link to anymore once paths are removed.
+    """
+    links = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        key = (st.st_dev, st.st_ino)
+        links[key] = links.get(key, 0) + 1
+    count = 0
+    size = 0
+    for entry in iter_blobs(store_dir):
+        st = entry.stat()
+        if st.st_nlink - links.get((st.st_dev, st.st_ino), 0) <= 1:
+            count += 1
+            size += st.st_size
+    return count, size
+
+
+def _sweep(base_dir, exclude, dry_run, workers):
+    unreachable = find_unreachable(base_dir, exclude)
+    report = {"skipped": unreadable_versions(base_dir, exclude)}
+    if dry_run:
+        for kind, files in unreachable.items():
+            report[kind] = (len(files), sum(files.values()))
+        removed = list(unreachable["libraries"])
+        for version_id in exclude:
+            removed.extend(_walk_files(base_dir / "versions" / version_id))
+        report["store"] = _store_freed(base_dir / "store", removed)
+        return report
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for kind, files in unreachable.items():
+            paths = list(files)
+            removed = [p for p, ok in zip(paths, pool.map(_unlink, paths, chunksize=64)) if ok]
+            report[kind] = (len(removed), sum(files[p] for p in removed))
+    _remove_empty_dirs(base_dir / "libraries")
+    report["store"] = gc_store(base_dir / "store")
+    return report
+
+
+def sweep(base_dir, dry_run=False, workers=UNLINK_WORKERS):
+    """
+    Removes the objects, libraries and asset indexes no installed version uses (see
+    find_unreachable), unlinking on `workers` threads, then the store blobs nothing links
+    to anymore and the library folders left empty.
+    With dry_run nothing is removed and the report says what would be.
+
+    Returns a report dict: {kind: (files, bytes)} for objects, libraries, indexes and
+    store, skipped (version folders without a readable JSON, which keep every object,
+    library and index in place) and seconds.
+    """
+    start = time.perf_counter()
+    report = _sweep(Path(base_dir), (), dry_run, workers)
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def delete_version(base_dir, version_id, dry_run=False, workers=UNLINK_WORKERS):
+    """
+    Deletes an installed version folder, then sweeps what only it used (see sweep).
+    The report also has "version": (files, bytes) of the folder itself.
+    With dry_run nothing is removed and the report says what deleting would free.
+    """
+    start = time.perf_counter()
+    base_dir = Path(base_dir)
+    version_folder = base_dir / "versions" / version_id
+    if not version_folder.is_dir():
+        raise FileNotFoundError(f"Version {version_id} is not installed")
+    version_files = _walk_files(version_folder)
+    if not dry_run:
+        shutil.rmtree(version_folder)
+    report = _sweep(base_dir, (version_id,), dry_run, workers)
+    report["version"] = (len(version_files), sum(version_files.values()))
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def print_sweep_report(report, dry_run=False):
+    action = "Would free" if dry_run else "Freed"
+    total = 0
+    for kind in ("version", "objects", "libraries", "indexes", "store"):
+        if kind in report:
+            files, size = report[kind]
+            total += size
+            print(f"{kind}: {files} file(s), {size / 1024 / 1024:.1f} MB")
+    print(f"{action} {total / 1024 / 1024:.1f} MB in {report['seconds']:.2f}s")
+    if report.get("skipped"):
+        print(f"Kept every asset, library and index: no readable version JSON in {', '.join(report['skipped'])}")
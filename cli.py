@@ -0,0 +1,269 @@
+"""
+Command line interface, for scripts and CI:
+
+    python cli.py install 1.20.4 [1.19.4 ...] [--workers 32] [--offline]
+    python cli.py launch 1.20.4 --username Steve [--dry-run]
+    python cli.py list [--installed] [--type release]
+    python cli.py repair 1.20.4 [1.19.4 ...]
+    python cli.py verify
+    python cli.py gc [--dry-run]
+    python cli.py delete 1.20.4 [--dry-run]
+    python cli.py accounts import bots.csv | export out.jsonl | list
+    python cli.py launch-many 1.20.4 --count 50 --max-running 8 [--max-ram 1G] [--report out.json]
+    python cli.py serve-cache [--port 8080]
+    python cli.py install 1.20.4 --mirror http://lan-host:8080
+
+Exit codes: 0 success, 1 error (for launch: also the game exiting with an error), 2 bad usage,
+3 finished with failed/corrupt files.
+"""
+import argparse
+import sys
+
+import api
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_INCOMPLETE = 3
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pml", description="Python Minecraft Launcher")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--base-dir", default=str(api.BASE_DIR), help="game folder (default: %(default)s)")
+    common.add_argument("--insecure", action="store_true", help="don't verify TLS certificates")
+    common.add_argument("--mirror", action="append", metavar="URL",
+                        help="mirror tried before the official servers, repeatable (e.g. a serve-cache)")
+    network = argparse.ArgumentParser(add_help=False, parents=[common])
+    network.add_argument("--manifest-url", default=api.MANIFEST_URL)
+    network.add_argument("--ttl", type=int, default=600, help="seconds the cached manifest is trusted")
+    network.add_argument("--offline", action="store_true", help="only use cached metadata")
+
+    p = sub.add_parser("install", parents=[network], help="install one or more versions")
+    p.add_argument("versions", nargs="+", metavar="version")
+    p.add_argument("--workers", type=int, default=16)
+    p.add_argument("--segments", type=int, default=4)
+    p.add_argument("--metrics", metavar="PATH", help="append a metrics snapshot to this JSON lines file")
+
+    p = sub.add_parser("repair", parents=[network], help="re-fetch only the missing or corrupt files of versions")
+    p.add_argument("versions", nargs="+", metavar="version")
+    p.add_argument("--workers", type=int, default=16)
+    p.add_argument("--segments", type=int, default=4)
+
+    p = sub.add_parser("launch", parents=[common], help="start an installed version")
+    p.add_argument("version")
+    p.add_argument("--username", required=True)
+    p.add_argument("--uuid", help="defaults to the offline uuid of the username")
+    p.add_argument("--access-token", default="0")
+    p.add_argument("--java", help="java executable (default: find or install a matching one)")
+    p.add_argument("--java-cmd", default="java", help="java command looked up on PATH")
+    p.add_argument("--max-ram", help="e.g. 4G")
+    p.add_argument("--no-java-install", action="store_true", help="fail instead of downloading Java")
+    p.add_argument("--no-argfile", action="store_true", help="pass the classpath on the command line")
+    p.add_argument("--cds", action="store_true", help="use an AppCDS archive (Java 19+)")
+    p.add_argument("--dry-run", action="store_true", help="print the command instead of running it")
+
+    p = sub.add_parser("launch-many", parents=[common], help="run several instances at once")
+    p.add_argument("version")
+    p.add_argument("--count", type=int, required=True)
+    p.add_argument("--max-running", type=int, default=4, help="instances running at the same time")
+    p.add_argument("--username-prefix", help="use <prefix><n> accounts instead of the registry's")
+    p.add_argument("--max-ram", help="per instance, e.g. 1G")
+    p.add_argument("--java", help="java executable (default: find or install a matching one)")
+    p.add_argument("--sample-interval", type=float, default=1.0, help="seconds between CPU/RSS samples")
+    p.add_argument("--report", metavar="PATH", help="write the per-instance report as JSON")
+
+    p = sub.add_parser("list", parents=[network], help="list available or installed versions")
+    p.add_argument("--installed", action="store_true")
+    p.add_argument("--type", action="append", choices=api.VERSION_TYPES, help="repeatable (default: all)")
+
+    p = sub.add_parser("verify", parents=[common], help="hash every installed file")
+    p.add_argument("--workers", type=int)
+
+    p = sub.add_parser("gc", parents=[common], help="remove assets, libraries and jars no version uses")
+    p.add_argument("--dry-run", action="store_true", help="only report what would be removed")
+
+    p = sub.add_parser("delete", parents=[common], help="delete a version and what only it used")
+    p.add_argument("version")
+    p.add_argument("--dry-run", action="store_true", help="only report what would be removed")
+
+    p = sub.add_parser("accounts", parents=[common], help="bulk import/export accounts")
+    p.add_argument("action", choices=["import", "export", "list"])
+    p.add_argument("file", nargs="?", help=".csv or .jsonl")
+
+    p = sub.add_parser("serve-cache", parents=[common], help="serve the game folder as a mirror for other machines")
+    p.add_argument("--bind", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=8080)
+    return parser
+
+
+def cmd_install(args):
+    report = api.install_versions(args.versions, args.base_dir, manifest_url=args.manifest_url,
+                                  workers=args.workers, segments=args.segments, ttl=args.ttl, offline=args.offline)
+    if args.metrics:
+        from metrics import write_jsonl
+
+        write_jsonl(args.metrics, event="install", versions=report["versions"], failures=len(report["failures"]),
+                    bytes_saved=report["bytes_saved"])
+    if report["failures"]:
+        from installer import print_failure_report
+
+        print_failure_report(report)
+    print(f"{', '.join(report['versions'])}: {report['files']} files in {report['seconds']:.1f}s,"
+          f" {len(report['failures'])} failed")
+    if len(report["versions"]) > 1:
+        print(f"Shared files: {report['bytes_needed'] / 1024 / 1024:.1f} MB needed,"
+              f" {report['bytes_unique'] / 1024 / 1024:.1f} MB unique,"
+              f" {report['bytes_saved'] / 1024 / 1024:.1f} MB saved by deduplication")
+    return EXIT_INCOMPLETE if report["failures"] else EXIT_OK
+
+
+def cmd_repair(args):
+    from installer import print_failure_report
+    from repair import print_repair_report
+
+    report = api.repair(args.versions, args.base_dir, manifest_url=args.manifest_url, workers=args.workers,
+                        segments=args.segments, ttl=args.ttl, offline=args.offline)
+    print_repair_report(report)
+    if report["failures"]:
+        print_failure_report(report)
+    return EXIT_INCOMPLETE if report["failures"] else EXIT_OK
+
+
+def cmd_launch(args):
+    kwargs = dict(java_path=args.java, user_uuid=args.uuid, access_token=args.access_token, max_ram=args.max_ram,
+                  argfile=not args.no_argfile, cds=args.cds, java_cmd=args.java_cmd,
+                  install_java=not args.no_java_install)
+    if args.dry_run:
+        import shlex
+
+        print(shlex.join(map(str, api.launch_command(args.version, args.username, args.base_dir, **kwargs))))
+        return EXIT_OK
+    # The game's own exit code would clash with ours
+    return EXIT_OK if api.launch(args.version, args.username, args.base_dir, **kwargs) == 0 else EXIT_ERROR
+
+
+def cmd_launch_many(args):
+    import json
+    from itertools import islice
+
+    from accounts import make_account
+    from orchestrator import run_instances
+
+    if args.username_prefix:
+        usernames = [f"{args.username_prefix}{n}" for n in range(args.count)]
+        accounts = [make_account(name) for name in usernames]
+    else:
+        accounts = list(islice(api.account_registry(args.base_dir), args.count))
+        if len(accounts) < args.count:
+            print(f"pml launch-many: only {len(accounts)} account(s) in the registry", file=sys.stderr)
+            return EXIT_USAGE
+    specs = [{"version": args.version, "account": account, "max_ram": args.max_ram} for account in accounts]
+    reports = run_instances(specs, args.base_dir, max_running=args.max_running, sample_interval=args.sample_interval,
+                            java_path=args.java)
+    for r in reports:
+        rss = f"{r['peak_rss'] / 1024 / 1024:.0f} MB" if r["peak_rss"] else "-"
+        cpu = f"{r['cpu_seconds']:.1f}s" if r["cpu_seconds"] is not None else "-"
+        print(f"{r['name']}: exit {r['returncode']}, {r['seconds']:.1f}s, cpu {cpu}, peak rss {rss}"
+              + (f" ({r['error']})" if r["error"] else ""))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=4)
+    return EXIT_OK if all(r["returncode"] == 0 for r in reports) else EXIT_INCOMPLETE
+
+
+def cmd_list(args):
+    if args.installed:
+        for version_id in api.installed_versions(args.base_dir):
+            print(version_id)
+        return EXIT_OK
+    for version in api.list_versions(args.base_dir, args.type or api.VERSION_TYPES, args.manifest_url,
+                                     args.ttl, args.offline):
+        print(f"{version['id']}\t{version['type']}\t{version['releaseTime']}")
+    return EXIT_OK
+
+
+def cmd_verify(args):
+    from verify import print_report
+
+    report = api.verify(args.base_dir, args.workers)
+    print_report(report)
+    return EXIT_INCOMPLETE if report["problems"] else EXIT_OK
+
+
+def cmd_gc(args):
+    from cleanup import print_sweep_report
+
+    print_sweep_report(api.gc(args.base_dir, args.dry_run), args.dry_run)
+    return EXIT_OK
+
+
+def cmd_delete(args):
+    from cleanup import print_sweep_report
+
+    print_sweep_report(api.delete_version(args.version, args.base_dir, args.dry_run), args.dry_run)
+    return EXIT_OK
+
+
+def cmd_accounts(args):
+    registry = api.account_registry(args.base_dir)
+    if args.action == "list":
+        for account in registry:
+            print(f"{account['username']}\t{account['uuid']}\t{'online' if account['online'] else 'offline'}")
+        return EXIT_OK
+    if not args.file:
+        print(f"pml accounts {args.action}: a file is needed", file=sys.stderr)
+        return EXIT_USAGE
+    if args.action == "import":
+        print(f"Imported {registry.import_file(args.file)} new account(s), {len(registry)} in total")
+    else:
+        print(f"Exported {registry.export_file(args.file)} account(s)")
+    return EXIT_OK
+
+
+def cmd_serve_cache(args):
+    print(f"Serving {args.base_dir} on http://{args.bind}:{args.port}")
+    api.serve_cache(args.base_dir, args.bind, args.port)
+    return EXIT_OK
+
+
+COMMANDS = {
+    "install": cmd_install,
+    "repair": cmd_repair,
+    "launch": cmd_launch,
+    "launch-many": cmd_launch_many,
+    "list": cmd_list,
+    "verify": cmd_verify,
+    "gc": cmd_gc,
+    "delete": cmd_delete,
+    "accounts": cmd_accounts,
+    "serve-cache": cmd_serve_cache,
+}
+
+
+def main(argv=None):
+    try:
+        args = build_parser().parse_args(argv)
+    except SystemExit as e:
+        return EXIT_OK if e.code == 0 else EXIT_USAGE
+    if args.insecure:
+        from downloader import set_tls_verification
+
+        set_tls_verification(False)
+    if args.mirror:
+        from mirrors import set_mirrors
+
+        set_mirrors(args.mirror)
+    try:
+        return COMMANDS[args.command](args)
+    except KeyboardInterrupt:
+        return EXIT_ERROR
+    except Exception as e:
+        print(f"pml {args.command}: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
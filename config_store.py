@@ -0,0 +1,167 @@
+import atexit
+import copy
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ---------------- CONFIG ----------------
+WRITE_DELAY = 0.5  # seconds changes are collected before they are written
+# ----------------------------------------
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Exclusive lock on path (created if needed), held across processes on this host.
+    """
+    with open(path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _fill_defaults(data, defaults):
+    """
+    Adds the missing keys of defaults to data, one level into dict values. Returns True if anything was added.
+    """
+    updated = False
+    for key, value in defaults.items():
+        if key not in data:
+            data[key] = copy.deepcopy(value)
+            updated = True
+        elif isinstance(value, dict) and isinstance(data[key], dict):
+            for sub_key, sub_value in value.items():
+                if sub_key not in data[key]:
+                    data[key][sub_key] = copy.deepcopy(sub_value)
+                    updated = True
+    return updated
+
+
+class ConfigStore:
+    """
+    The launcher config (a JSON object) with missing keys filled from defaults.
+
+    Changes are collected for `delay` seconds and written together: the file is locked,
+    read again, the changed keys are put on top of what is on disk (so a launcher running
+    at the same time keeps its own changes to other keys), and the result is written to a
+    temporary file and renamed over the config. A crash mid-write leaves the old file.
+
+    Values are read with store[key]. Assigning store[key] = value checks the value against
+    the type of the default; after changing a value in place (e.g. appending to a list),
+    call store.changed(key).
+    """
+
+    def __init__(self, path, defaults, delay=WRITE_DELAY):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.defaults = defaults
+        self.delay = delay
+        self._data = {}
+        self._dirty = set()
+        self._lock = threading.RLock()
+        self._timer = None
+        self.load()
+        atexit.register(self.flush)
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            # Unreadable: start over from the defaults rather than refusing to start
+            return {}
+
+    def _write(self, data):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def load(self):
+        """
+        (Re)reads the file. Keys changed here and not written yet are kept.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, file_lock(self.lock_path):
+            data = self._read()
+            missing = not self.path.exists()
+            if _fill_defaults(data, self.defaults) or missing:
+                self._write(data)
+            for key in self._dirty:
+                data[key] = self._data[key]
+            self._data = data
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def __setitem__(self, key, value):
+        expected = self.defaults.get(key)
+        if expected is not None and not isinstance(value, type(expected)):
+            raise TypeError(f"Config {key} must be {type(expected).__name__}, not {type(value).__name__}")
+        with self._lock:
+            self._data[key] = value
+        self.changed(key)
+
+    def changed(self, *keys):
+        """
+        Marks keys as changed and (re)starts the write timer.
+        """
+        with self._lock:
+            self._dirty.update(keys)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """
+        Writes the pending changes now.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            with file_lock(self.lock_path):
+                data = self._read()
+                _fill_defaults(data, self.defaults)
+                for key in self._dirty:
+                    data[key] = self._data[key]
+                self._write(data)
+            self._data = data
+            self._dirty.clear()
+
+    def as_dict(self):
+        return copy.deepcopy(self._data)
@@ -0,0 +1,500 @@
+import hashlib
+import http.client
+import os
+import ssl
+import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import metrics
+import mirrors
+import rate_control
+
+# ---------------- CONFIG ----------------
+ASSETS_BASE_URL = "https://resources.download.minecraft.net"
+USER_AGENT = "Python Minecraft Launcher/1.0"
+DEFAULT_WORKERS = 16
+PROGRESS_INTERVAL = 1.0  # seconds between progress lines
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_RETRIES = 4  # per file, on top of the shared retry budget (see rate_control)
+DRAIN_LIMIT = 64 * 1024  # unread bytes worth draining to keep a connection alive
+MIN_SEGMENT_SIZE = 8 * 1024 * 1024  # smallest range handed to one segment
+# ----------------------------------------
+
+_local = threading.local()
+_ssl_context = None  # None: Python's default, verified context
+
+
+def set_tls_verification(enabled):
+    """
+    Turns certificate verification of new HTTPS connections on or off (on by default).
+    Only meant for machines whose Python has no CA certificates installed.
+    """
+    global _ssl_context
+    _ssl_context = None if enabled else ssl._create_unverified_context()
+
+
+def _get_connection(scheme, netloc):
+    """
+    Returns a keep-alive connection for (scheme, netloc) owned by the calling thread.
+    Every thread keeps its own connection per host, so together they form a
+    per-host pool that is never used by two threads at once.
+    """
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get((scheme, netloc))
+    if conn is None:
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(netloc, timeout=30, context=_ssl_context)
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=30)
+        conns[(scheme, netloc)] = conn
+    return conn
+
+
+def _drop_connection(scheme, netloc):
+    conns = getattr(_local, "conns", {})
+    conn = conns.pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def _send(url, headers):
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    key = (parts.scheme, parts.netloc)
+    all_headers = {"User-Agent": USER_AGENT, "Accept": "*/*"}
+    all_headers.update(headers or {})
+    for attempt in range(2):
+        conn = _get_connection(*key)
+        reused = conn.sock is not None
+        try:
+            start = time.perf_counter()
+            conn.request("GET", path, headers=all_headers)
+            resp = conn.getresponse()
+            metrics.LATENCY.observe(time.perf_counter() - start, host=parts.netloc)
+            metrics.REQUESTS.inc(host=parts.netloc, status=resp.status)
+            return resp, key
+        except (http.client.HTTPException, ConnectionError, OSError):
+            _drop_connection(*key)
+            # The server may have closed an idle keep-alive connection, reopen once
+            if attempt == 0 and reused:
+                continue
+            raise
+
+
+class HTTPError(OSError):
+    def __init__(self, status, reason, url, retry_after=None):
+        super().__init__(f"HTTP Error {status}: {reason} ({url})")
+        self.status = status
+        self.retry_after = retry_after  # seconds, from a Retry-After header
+
+
+def _retry_after(resp):
+    value = resp.getheader("Retry-After", "")
+    return float(value) if value.isdigit() else None
+
+
+def _open(url, headers, ok, max_redirects):
+    for _ in range(max_redirects + 1):
+        resp, key = _send(url, headers)
+        if resp.status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+            resp.read()
+            url = urllib.parse.urljoin(url, resp.getheader("Location"))
+            continue
+        break
+    if resp.status not in ok:
+        resp.read()
+        raise HTTPError(resp.status, resp.reason, url, _retry_after(resp))
+    return resp, key
+
+
+@contextmanager
+def open_url(url, headers=None, ok=(200,), max_redirects=5, skip_mirrors=(), served=None):
+    """
+    GETs url over a pooled keep-alive connection and yields the response with its body unread.
+    Configured mirrors (see mirrors.py) are tried first, best scored first; a mirror that
+    fails or doesn't have the file falls through to the next one and finally to url itself.
+    Mirrors in skip_mirrors are not tried; the mirror that answers (None for url itself)
+    is appended to the `served` list when one is given.
+    Every request holds a slot of its host's concurrency limit (see rate_control) until
+    the body is done with.
+    Redirects are followed; any final status not in `ok` raises HTTPError (an OSError).
+    The body is drained on exit so the connection can serve the next request.
+    """
+    choices = mirrors.candidates(url, skip_mirrors)
+    for n, (mirror, candidate) in enumerate(choices):
+        limit = rate_control.host_limit(urllib.parse.urlsplit(candidate).netloc)
+        ticket = limit.acquire()
+        start = time.perf_counter()
+        try:
+            resp, key = _open(candidate, headers, ok, max_redirects)
+        except OSError as e:
+            limit.release(ticket, getattr(e, "status", None))
+            # A mirror without the file is fine, one that errors is scored down
+            if not (isinstance(e, HTTPError) and e.status == 404):
+                mirrors.record(mirror)
+            if n == len(choices) - 1:
+                raise
+            continue
+        mirrors.record(mirror, time.perf_counter() - start)
+        if served is not None:
+            served.append(mirror)
+        break
+    try:
+        yield resp
+    except BaseException:
+        _drop_connection(*key)
+        limit.release(ticket)
+        raise
+    try:
+        if not resp.isclosed():
+            if resp.length is not None and resp.length > DRAIN_LIMIT:
+                # Cheaper to reconnect than to read the rest of a big body
+                _drop_connection(*key)
+            else:
+                resp.read()
+    finally:
+        limit.release(ticket, resp.status)
+    rate_control.record_success()
+
+
+def _distrust(served, skip_mirrors):
+    # The mirrors that sent bad data are scored down and not asked again for this file
+    for mirror in served:
+        if mirror is not None:
+            mirrors.record(mirror)
+            skip_mirrors.add(mirror)
+
+
+class ChecksumError(OSError):
+    pass
+
+
+class RangeIgnoredError(OSError):
+    """
+    The server answered a request for part of a file with the whole file.
+    """
+
+
+def describe_error(error):
+    """
+    Short failure reason for reports: "HTTP 503", "checksum mismatch", "timeout", ...
+    """
+    if isinstance(error, HTTPError):
+        return f"HTTP {error.status}"
+    if isinstance(error, ChecksumError):
+        return "checksum mismatch"
+    if isinstance(error, TimeoutError):
+        return "timeout"
+    return type(error).__name__
+
+
+def should_retry(error, attempt, retries):
+    """
+    Waits out the backoff before retry number attempt of a failed download and returns
+    True, or returns False when the download should give up: out of attempts, out of
+    retry budget, or an error a retry won't fix (a 4xx other than 408/429).
+    """
+    if attempt >= retries:
+        return False
+    status = getattr(error, "status", None)
+    if status is not None and 400 <= status < 500 and status not in (408, 429):
+        return False
+    return rate_control.wait_before_retry(attempt, getattr(error, "retry_after", None))
+
+
+def _stream_to_file(url, out_file, sha1, size, headers, skip_mirrors=(), served=None):
+    """
+    Streams url into a temporary file next to out_file, hashing it on the way,
+    and renames it into place only when size and SHA-1 match.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=out_file.parent, prefix=f".{out_file.name}.", suffix=".part")
+    digest = hashlib.sha1()
+    written = 0
+    try:
+        # The file is opened first so that a failed request still closes fd
+        with os.fdopen(fd, "wb") as f, open_url(url, headers, skip_mirrors=skip_mirrors, served=served) as resp:
+            while True:
+                chunk = resp.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+                written += len(chunk)
+                metrics.BYTES.inc(len(chunk))
+        if size is not None and written != size:
+            raise ChecksumError(f"Size mismatch for {out_file.name}: expected {size}, got {written}")
+        if sha1 is not None and digest.hexdigest() != sha1.lower():
+            raise ChecksumError(f"SHA-1 mismatch for {out_file.name}: expected {sha1}, got {digest.hexdigest()}")
+        os.replace(tmp_name, out_file)
+        metrics.FILES.inc()
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def download_file(url, out_file, sha1=None, size=None, headers=None, retries=DEFAULT_RETRIES):
+    """
+    Streams url into out_file, replacing it atomically.
+    When sha1/size are given the data is checked while it is written.
+    A failed download is retried up to `retries` more times (see should_retry); a mirror
+    that sent bad data is skipped on the retries.
+    """
+    out_file = Path(out_file)
+    skip_mirrors = set()
+    for attempt in range(retries + 1):
+        served = []
+        try:
+            _stream_to_file(url, out_file, sha1, size, headers, skip_mirrors, served)
+            return
+        except OSError as e:
+            if isinstance(e, ChecksumError):
+                _distrust(served, skip_mirrors)
+            if not should_retry(e, attempt, retries):
+                raise
+
+
+def _hash_file_into(digest, path):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+
+
+def _fetch_range(url, part, start, end, headers, digest=None, skip_mirrors=(), served=None):
+    """
+    Appends bytes [start, end] (end inclusive, None = until EOF) of url to the partial file `part`,
+    continuing after whatever `part` already holds. Returns the digest of the whole part file
+    when `digest` is given. Raises RangeIgnoredError if the server sends the whole file for a
+    range that doesn't start at 0 or has an end.
+    """
+    have = part.stat().st_size if part.exists() else 0
+    if end is not None and start + have > end:
+        return digest
+    all_headers = dict(headers or {})
+    if have or start or end is not None:
+        all_headers["Range"] = f"bytes={start + have}-{'' if end is None else end}"
+    with open_url(url, all_headers, ok=(200, 206, 416), skip_mirrors=skip_mirrors, served=served) as resp:
+        if resp.status == 416:
+            # Nothing left to fetch, the partial file already holds everything
+            if digest is not None:
+                _hash_file_into(digest, part)
+            return digest
+        if resp.status == 206:
+            mode = "ab"
+            if digest is not None and have:
+                _hash_file_into(digest, part)
+        elif start or end is not None:
+            raise RangeIgnoredError(f"{url} doesn't support Range requests")
+        else:
+            # The server ignored the Range header, start over
+            mode = "wb"
+        with open(part, mode) as f:
+            while True:
+                chunk = resp.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if digest is not None:
+                    digest.update(chunk)
+                f.write(chunk)
+                metrics.BYTES.inc(len(chunk))
+    return digest
+
+
+def probe_size(url, headers=None):
+    """
+    Returns the total size of url if the server honours Range requests, otherwise None.
+    """
+    all_headers = dict(headers or {})
+    all_headers["Range"] = "bytes=0-0"
+    with open_url(url, all_headers, ok=(200, 206)) as resp:
+        if resp.status != 206:
+            return None
+        content_range = resp.getheader("Content-Range", "")
+    total = content_range.rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+def _download_segments(url, part, total, segments, headers, skip_mirrors=(), served=None):
+    """
+    Fetches url as `segments` parallel ranges into part.0 ... part.N-1 (each one resumable),
+    then joins them into part. Returns the digest of the joined file.
+    """
+    seg_size = -(-total // segments)
+    ranges = [(i * seg_size, min(total, (i + 1) * seg_size) - 1) for i in range(segments)]
+    seg_files = [part.with_name(f"{part.name}.{i}") for i in range(segments)]
+    with ThreadPoolExecutor(max_workers=segments) as pool:
+        futures = [pool.submit(_fetch_range, url, seg_file, start, end, headers, None, skip_mirrors, served)
+                   for seg_file, (start, end) in zip(seg_files, ranges)]
+        for future in futures:
+            future.result()
+
+    digest = hashlib.sha1()
+    with open(part, "wb") as out:
+        for seg_file in seg_files:
+            with open(seg_file, "rb") as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+    for seg_file in seg_files:
+        seg_file.unlink()
+    return digest
+
+
+def download_resumable(url, out_file, sha1=None, size=None, segments=1, headers=None, retries=DEFAULT_RETRIES):
+    """
+    Streams a large file to disk in CHUNK_SIZE pieces, keeping memory use constant.
+    Data goes to out_file.part and is resumed with a Range request if a previous run was cut off.
+    With segments > 1 and a server that supports ranges, the file is fetched as parallel segments;
+    if it turns out not to, the file is fetched in one stream instead.
+    The finished file is checked against sha1/size (when given) and renamed into place;
+    the mirrors that served a bad file are skipped on the retries.
+    """
+    out_file = Path(out_file)
+    part = out_file.with_name(out_file.name + ".part")
+    skip_mirrors = set()
+    for attempt in range(retries + 1):
+        served = []
+        try:
+            total = size
+            if segments > 1 and total is None:
+                total = probe_size(url, headers)
+            if segments > 1 and total and total >= 2 * MIN_SEGMENT_SIZE:
+                segments = min(segments, total // MIN_SEGMENT_SIZE)
+                try:
+                    digest = _download_segments(url, part, total, segments, headers, skip_mirrors, served)
+                except RangeIgnoredError:
+                    segments = 1
+                    for stale in part.parent.glob(part.name + ".*"):
+                        stale.unlink()
+                    digest = _fetch_range(url, part, 0, None, headers, hashlib.sha1(), skip_mirrors, served)
+            else:
+                digest = _fetch_range(url, part, 0, None, headers, hashlib.sha1(), skip_mirrors, served)
+
+            written = part.stat().st_size
+            if size is not None and written != size:
+                raise ChecksumError(f"Size mismatch for {out_file.name}: expected {size}, got {written}")
+            if sha1 is not None and digest.hexdigest() != sha1.lower():
+                raise ChecksumError(f"SHA-1 mismatch for {out_file.name}: expected {sha1}, got {digest.hexdigest()}")
+            os.replace(part, out_file)
+            metrics.FILES.inc()
+            return
+        except ChecksumError as e:
+            # Resuming a corrupt partial file would only repeat the error
+            for stale in part.parent.glob(part.name + "*"):
+                stale.unlink()
+            _distrust(served, skip_mirrors)
+            if not should_retry(e, attempt, retries):
+                raise
+        except OSError as e:
+            # Keep the partial file, the next attempt resumes from it
+            if not should_retry(e, attempt, retries):
+                raise
+
+
+def is_complete(path, size=None):
+    """
+    Cheap (stat only) check that path exists and has the expected size.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return size is None or st.st_size == size
+
+
+class Progress:
+    """
+    Counts finished files; a background thread prints "done/total" and the download
+    rate from the metrics counters every `interval` seconds until the progress is closed.
+    Use it as a context manager.
+    """
+
+    def __init__(self, total, label="files", interval=PROGRESS_INTERVAL):
+        self.total = total
+        self.label = label
+        self.interval = interval
+        self.done = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._start = time.monotonic()
+        self._start_bytes = metrics.BYTES.total()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.show()
+
+    def add(self, n):
+        with self._lock:
+            self.total += n
+
+    def step(self, n=1):
+        with self._lock:
+            self.done += n
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.show()
+
+    def show(self):
+        elapsed = time.monotonic() - self._start
+        rate = (metrics.BYTES.total() - self._start_bytes) / 1024 / 1024 / elapsed if elapsed else 0.0
+        percent = int(self.done / self.total * 100) if self.total else 100
+        print(f"Total {self.label}: {self.total}, currently downloaded: {self.done} ({percent}%) -- {rate:.1f} MB/s")
+
+
+def asset_path(objects_dir, asset_hash):
+    return Path(objects_dir) / asset_hash[:2] / asset_hash
+
+
+def missing_objects(wanted, objects_dir, present=None):
+    """
+    Returns the part of wanted ({hash: (label, size)}) that is not on disk in objects_dir
+    (or has the wrong size), with the shard folders of the missing ones created.
+    present is an optional {hash: size} snapshot of objects_dir (see object_index); with it
+    nothing is stat()ed and the check is a set difference.
+    """
+    pending = {}
+    if present is not None:
+        for asset_hash in wanted.keys() - present.keys():
+            pending[asset_hash] = wanted[asset_hash]
+        for asset_hash in wanted.keys() & present.keys():
+            size = wanted[asset_hash][1]
+            if present[asset_hash] is not None and size is not None and present[asset_hash] != size:
+                pending[asset_hash] = wanted[asset_hash]
+    else:
+        for asset_hash, (label, size) in wanted.items():
+            if not is_complete(asset_path(objects_dir, asset_hash), size):
+                pending[asset_hash] = (label, size)
+    metrics.CACHE.inc(len(wanted) - len(pending), cache="assets", result="hit")
+    metrics.CACHE.inc(len(pending), cache="assets", result="miss")
+    for sub_dir in {h[:2] for h in pending}:
+        (Path(objects_dir) / sub_dir).mkdir(parents=True, exist_ok=True)
+    return pending
+
+
+def download_asset(asset_hash, size, objects_dir, base_url=ASSETS_BASE_URL):
+    url = f"{base_url}/{asset_hash[:2]}/{asset_hash}"
+    download_file(url, asset_path(objects_dir, asset_hash), sha1=asset_hash, size=size)
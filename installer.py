@@ -0,0 +1,252 @@
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import metrics
+import rate_control
+from downloader import (ASSETS_BASE_URL, DEFAULT_WORKERS, Progress, describe_error, download_asset, download_file,
+                        is_complete, missing_objects)
+from asset_index import load_asset_index
+from launch import build_launch_manifest
+from libraries import download_library, extract_natives, missing_libraries, resolve_libraries
+from manifest import DEFAULT_TTL, MANIFEST_URL, load_manifest_index, save_version_json
+from object_index import load_object_index
+from store import fetch_to_store
+
+# ---------------- CONFIG ----------------
+BASE_DIR = Path("mc")
+DEFAULT_SEGMENTS = 4
+# ----------------------------------------
+
+
+def find_version(version_id, cache_dir, manifest_url=MANIFEST_URL, ttl=DEFAULT_TTL, offline=False):
+    """
+    Returns the manifest entry of version_id. Raises OSError without a manifest
+    and ValueError for an unknown id.
+    """
+    index = load_manifest_index(cache_dir, manifest_url, ttl=ttl, offline=offline)
+    if index is None:
+        raise OSError("Unable to fetch the version manifest")
+    version = index.get(version_id)
+    if version is None:
+        raise ValueError(f"Unknown version: {version_id}")
+    return version
+
+
+def _fetch_asset_index(asset_index, index_path, cache_dir):
+    if not is_complete(index_path, asset_index.get("size")):
+        download_file(asset_index["url"], index_path, sha1=asset_index.get("sha1"), size=asset_index.get("size"))
+    return load_asset_index(index_path, cache_dir)
+
+
+def _load_version(version, base_dir, offline):
+    version_folder = base_dir / "versions" / version["id"]
+    version_folder.mkdir(parents=True, exist_ok=True)
+    json_path = version_folder / f"{version['id']}.json"
+    save_version_json(version, json_path, base_dir / "cache", offline=offline)
+    with open(json_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def install_many(version_ids, base_dir=BASE_DIR, manifest_url=MANIFEST_URL, workers=DEFAULT_WORKERS,
+                 segments=DEFAULT_SEGMENTS, ttl=DEFAULT_TTL, offline=False, features=None,
+                 assets_base_url=ASSETS_BASE_URL):
+    """
+    Installs several versions under base_dir in one go.
+
+    Their version JSONs are fetched in parallel, then the union of everything they need is
+    downloaded on one shared pool: a library path or an asset hash used by several versions
+    is checked and scheduled once, whichever asset index lists it first. Natives and launch
+    manifests are written per version once its own files are in. Assets already on disk are
+    found (with their sizes, so truncated ones are fetched again) from one listing of the
+    object store (see object_index), not a stat() each.
+    Unknown version ids raise ValueError before anything is downloaded.
+
+    Downloads never stop to ask: failed files (after their retries, see
+    downloader.should_retry) end up in the report, see print_failure_report.
+
+    Returns a report dict: versions, files (downloads scheduled), failures [(name, error)],
+    seconds, bytes_needed (sum over the versions of every file they use), bytes_unique
+    (the same, counting shared files once), bytes_saved (the difference) and hosts
+    (per-host concurrency limit and 429/5xx count, see rate_control.stats). Host limits and
+    the retry budget start over for every call, so one install doesn't inherit another's.
+    """
+    start = time.perf_counter()
+    rate_control.reset()
+    base_dir = Path(base_dir)
+    version_ids = list(dict.fromkeys(version_ids))
+    objects_dir = base_dir / "assets" / "objects"
+    indexes_dir = base_dir / "assets" / "indexes"
+    libraries_dir = base_dir / "libraries"
+    store_dir = base_dir / "store"
+
+    with metrics.timed_stage("version_json"):
+        index = load_manifest_index(base_dir / "cache", manifest_url, ttl=ttl, offline=offline)
+        if index is None:
+            raise OSError("Unable to fetch the version manifest")
+        versions = []
+        for version_id in version_ids:
+            version = index.get(version_id)
+            if version is None:
+                raise ValueError(f"Unknown version: {version_id}")
+            versions.append(version)
+        indexes_dir.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(versions)))) as pool:
+            json_datas = dict(zip(version_ids, pool.map(lambda v: _load_version(v, base_dir, offline), versions)))
+
+    libs = {version_id: resolve_libraries(json_data, libraries_dir, features) for version_id, json_data in json_datas.items()}
+    # One listing of the object store instead of a stat() per asset
+    with metrics.timed_stage("object_index"):
+        # With sizes: stores written by older launchers can hold truncated objects
+        present = load_object_index(objects_dir, base_dir / "cache" / "objects.index.json", sizes=True)
+    failures = []
+    failed = set()  # keys (paths / asset hashes) that failed
+    needs = {version_id: set() for version_id in version_ids}  # keys each version depends on
+    seen = set()
+    bytes_needed = 0
+    bytes_unique = 0
+    pending = {}
+    scheduled = 0
+    # Stages overlap, so each one is timed from its first scheduled file to its last finished one
+    stage_start = {}
+    stage_end = {}
+
+    def count(version_id, key, size):
+        # Returns True the first time any version asks for key
+        nonlocal bytes_needed, bytes_unique
+        needs[version_id].add(key)
+        bytes_needed += size or 0
+        if key in seen:
+            return False
+        seen.add(key)
+        bytes_unique += size or 0
+        return True
+
+    with Progress(0, "files") as progress, ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+
+        def schedule(kind, key, name, fn, *args, **kwargs):
+            nonlocal scheduled
+            stage_start.setdefault(kind, time.perf_counter())
+            pending[pool.submit(fn, *args, **kwargs)] = (kind, key, name)
+            progress.add(1)
+            scheduled += 1
+
+        new_libs = []
+        for version_id, json_data in json_datas.items():
+            client = json_data.get("downloads", {}).get("client")
+            client_path = base_dir / "versions" / version_id / f"{version_id}.jar"
+            if client:
+                count(version_id, str(client_path), client.get("size"))
+                if not is_complete(client_path, client.get("size")):
+                    schedule("client", str(client_path), client_path.name, fetch_to_store, client["url"], client_path,
+                             sha1=client.get("sha1"), size=client.get("size"), store_dir=store_dir, segments=segments)
+
+            asset_index = json_data.get("assetIndex")
+            if asset_index:
+                index_path = indexes_dir / f"{asset_index['id']}.json"
+                if count(version_id, str(index_path), asset_index.get("size")):
+                    schedule("index", str(index_path), index_path.name, _fetch_asset_index, asset_index, index_path,
+                             base_dir / "cache" / "asset_indexes")
+
+            for lib in libs[version_id]:
+                if count(version_id, str(lib["path"]), lib["size"]):
+                    new_libs.append(lib)
+        for lib in missing_libraries(new_libs):
+            schedule("library", str(lib["path"]), str(lib["path"]), download_library, lib, store_dir)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, key, name = pending.pop(future)
+                progress.step()
+                stage_end[kind] = time.perf_counter()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed.add(key)
+                    failures.append((name, e))
+                    continue
+                if kind == "index":
+                    # {hash: (position in the index, size)}, names are only looked up for downloads
+                    wanted = {}
+                    hashes = result.hashes()
+                    for version_id, json_data in json_datas.items():
+                        asset_index = json_data.get("assetIndex")
+                        if not asset_index or str(indexes_dir / f"{asset_index['id']}.json") != key:
+                            continue
+                        for i, (asset_hash, size) in enumerate(zip(hashes, result.sizes)):
+                            if count(version_id, asset_hash, size):
+                                wanted[asset_hash] = (i, size)
+                    for asset_hash, (i, size) in missing_objects(wanted, objects_dir, present).items():
+                        schedule("asset", asset_hash, result.name(i), download_asset, asset_hash, size, objects_dir,
+                                 assets_base_url)
+
+    for kind, started in stage_start.items():
+        metrics.STAGES.observe(stage_end[kind] - started, stage=kind)
+
+    for version_id, json_data in json_datas.items():
+        if needs[version_id] & failed:
+            continue
+        version_folder = base_dir / "versions" / version_id
+        try:
+            with metrics.timed_stage("natives"):
+                extract_natives(libs[version_id], version_folder / "natives")
+        except Exception as e:
+            failures.append((f"{version_id} natives", e))
+            continue
+        build_launch_manifest(version_folder, json_data, libraries_dir, features)
+    metrics.STAGES.observe(time.perf_counter() - start, stage="total")
+
+    return {
+        "versions": version_ids,
+        "files": scheduled,
+        "failures": failures,
+        "seconds": time.perf_counter() - start,
+        "bytes_needed": bytes_needed,
+        "bytes_unique": bytes_unique,
+        "bytes_saved": bytes_needed - bytes_unique,
+        "hosts": rate_control.stats(),
+    }
+
+
+def install(version_id, base_dir=BASE_DIR, manifest_url=MANIFEST_URL, workers=DEFAULT_WORKERS,
+            segments=DEFAULT_SEGMENTS, ttl=DEFAULT_TTL, offline=False, features=None,
+            assets_base_url=ASSETS_BASE_URL):
+    """
+    Installs version_id under base_dir without asking anything.
+
+    After the version JSON, every file the version needs (client jar, asset index, libraries
+    and, as soon as the index is in, every asset) is scheduled on one shared pool, so the
+    jar and libraries download while assets are in flight. Natives are extracted once all
+    libraries are present. Files already on disk with the right size are skipped.
+    The client jar and libraries go through the content-addressed store in base_dir/store,
+    so identical jars are downloaded and stored once across versions.
+
+    Returns a report dict: version, files (downloads scheduled), failures [(name, error)], seconds, hosts.
+    """
+    report = install_many([version_id], base_dir, manifest_url, workers, segments, ttl, offline, features,
+                          assets_base_url)
+    return {
+        "version": version_id,
+        "files": report["files"],
+        "failures": report["failures"],
+        "seconds": report["seconds"],
+        "hosts": report["hosts"],
+    }
+
+
+def print_failure_report(report, limit=5):
+    """
+    Prints the failures of an install report grouped by reason (at most `limit` names
+    each), and the hosts that answered 429/5xx with the concurrency they ended up at.
+    """
+    groups = {}
+    for name, e in report["failures"]:
+        groups.setdefault(describe_error(e), []).append(name)
+    for reason, names in sorted(groups.items(), key=lambda item: -len(item[1])):
+        more = f" and {len(names) - limit} more" if len(names) > limit else ""
+        print(f"{reason}: {len(names)} file(s): {', '.join(names[:limit])}{more}")
+    for host, stats in report.get("hosts", {}).items():
+        if stats["throttled"]:
+            print(f"{host}: {stats['throttled']} throttled response(s), concurrency down to {stats['limit']}")
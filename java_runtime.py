@@ -0,0 +1,315 @@
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from downloader import DEFAULT_RETRIES, download_resumable, open_url, should_retry
+
+# ---------------- CONFIG ----------------
+REGISTRY_VERSION = 1
+EXTRACT_WORKERS = 8
+# Adoptium JRE builds
+JAVA_DOWNLOAD_URL = "https://api.adoptium.net/v3/binary/latest/{major}/ga/{os}/{arch}/jre/hotspot/normal/eclipse"
+# ----------------------------------------
+
+RELEASE_VERSION = re.compile(r'^JAVA_VERSION="([^"]+)"', re.MULTILINE)
+RELEASE_ARCH = re.compile(r'^OS_ARCH="([^"]+)"', re.MULTILINE)
+
+
+def java_executable_name():
+    return "java.exe" if platform.system() == "Windows" else "java"
+
+
+def parse_major(version):
+    """
+    "1.8.0_392" -> 8, "17.0.8" -> 17, "21" -> 21
+    """
+    parts = version.split(".")
+    if parts[0] == "1" and len(parts) > 1:
+        return int(parts[1])
+    match = re.match(r"\d+", parts[0])
+    return int(match.group(0)) if match else None
+
+
+def get_java_major(java_path="java"):
+    """
+    Asks a java executable for its version (forks a JVM, only used when there's no release file).
+    """
+    proc = subprocess.run(
+        [java_path, "-version"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    # Java prints version info to stderr
+    text = proc.stderr.decode("utf-8", errors="ignore")
+    # Match: version "21.0.4" / version "1.8.0_392"
+    match = re.search(r'version\s+"([^"]+)"', text)
+    if match:
+        return parse_major(match.group(1))
+    return None
+
+
+def _find_home(runtime_dir):
+    """
+    The JAVA_HOME inside an extracted runtime folder (macOS archives nest it in Contents/Home).
+    """
+    for home in (runtime_dir, runtime_dir / "Contents" / "Home"):
+        if (home / "bin" / java_executable_name()).exists():
+            return home
+    return None
+
+
+def _probe_home(home):
+    """
+    Reads major version and architecture from a JAVA_HOME's "release" file. No subprocess.
+    """
+    try:
+        text = (home / "release").read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return None
+    version = RELEASE_VERSION.search(text)
+    if not version:
+        return None
+    arch = RELEASE_ARCH.search(text)
+    return {
+        "major": parse_major(version.group(1)),
+        "arch": arch.group(1) if arch else platform.machine().lower(),
+        "executable": str(home / "bin" / java_executable_name()),
+    }
+
+
+def _probe_command(path):
+    home = Path(path).parent.parent
+    info = _probe_home(home)
+    if info is None:
+        major = get_java_major(path)
+        if major is None:
+            return None
+        info = {"major": major, "arch": platform.machine().lower()}
+    info["executable"] = str(path)
+    return info
+
+
+def _load(registry_path):
+    try:
+        with open(registry_path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == REGISTRY_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": REGISTRY_VERSION, "roots": {}, "runtimes": {}, "commands": {}}
+
+
+def scan_runtimes(registry_path, roots=(), commands=()):
+    """
+    Returns every known Java runtime as a list of dicts (major, arch, executable, dir, mtime).
+
+    roots are folders holding extracted runtimes (one subfolder each); commands are
+    executables looked up on PATH (e.g. "java"). What was found is kept in registry_path
+    together with the folder/executable mtimes, and a runtime is only probed again when its
+    mtime changes, so in the common case this is a handful of stat() calls and no subprocess.
+    """
+    registry = _load(registry_path)
+    changed = False
+    runtimes = {}
+
+    for root in roots:
+        root = Path(root)
+        try:
+            root_mtime = root.stat().st_mtime_ns
+        except OSError:
+            continue
+        known = registry["roots"].get(str(root))
+        if known and known["mtime"] == root_mtime:
+            dirs = [Path(d) for d in known["dirs"]]
+        else:
+            # Dot folders are extractions still in progress
+            dirs = [d for d in root.iterdir() if d.is_dir() and not d.name.startswith(".")]
+            registry["roots"][str(root)] = {"mtime": root_mtime, "dirs": [str(d) for d in dirs]}
+            changed = True
+        for runtime_dir in dirs:
+            try:
+                mtime = runtime_dir.stat().st_mtime_ns
+            except OSError:
+                continue
+            entry = registry["runtimes"].get(str(runtime_dir))
+            if entry is None or entry["mtime"] != mtime:
+                home = _find_home(runtime_dir)
+                info = _probe_home(home) if home else None
+                entry = dict(info or {}, dir=str(runtime_dir), mtime=mtime)
+                registry["runtimes"][str(runtime_dir)] = entry
+                changed = True
+            if "major" in entry:
+                runtimes[entry["executable"]] = entry
+
+    for command in commands:
+        path = shutil.which(command)
+        if path is None:
+            continue
+        real = os.path.realpath(path)
+        try:
+            mtime = os.stat(real).st_mtime_ns
+        except OSError:
+            continue
+        entry = registry["commands"].get(command)
+        if entry is None or entry["mtime"] != mtime or entry["dir"] != real:
+            info = _probe_command(real)
+            entry = dict(info or {}, dir=real, mtime=mtime)
+            registry["commands"][command] = entry
+            changed = True
+        if "major" in entry:
+            runtimes.setdefault(entry["executable"], entry)
+
+    if changed:
+        Path(registry_path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{registry_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(registry, f, indent=4)
+        os.replace(tmp, registry_path)
+    return list(runtimes.values())
+
+
+def _normalize_arch(arch):
+    arch = arch.lower()
+    return {"amd64": "x86_64", "x64": "x86_64", "arm64": "aarch64"}.get(arch, arch)
+
+
+def find_java(required_major, registry_path, roots=(), commands=()):
+    """
+    Path of a Java executable with exactly the required major version, or None.
+    Runtimes built for this machine's architecture are preferred.
+    """
+    host_arch = _normalize_arch(platform.machine())
+    matches = [r for r in scan_runtimes(registry_path, roots, commands) if r["major"] == required_major]
+    matches.sort(key=lambda r: _normalize_arch(r["arch"]) != host_arch)
+    return matches[0]["executable"] if matches else None
+
+
+def java_download_url(major):
+    """
+    Adoptium download URL of a JRE with this major version for this machine.
+    """
+    system = platform.system()
+    os_name = "windows" if system == "Windows" else "mac" if system == "Darwin" else "linux"
+    arch = "aarch64" if _normalize_arch(platform.machine()) == "aarch64" else "x64"
+    return JAVA_DOWNLOAD_URL.format(major=major, os=os_name, arch=arch)
+
+
+def java_archive_name():
+    return "java.zip" if platform.system() == "Windows" else "java.tar.gz"
+
+
+def _safe_target(root, name):
+    """
+    Where archive member `name` lands under root; refuses absolute paths and anything
+    that would end up outside root.
+    """
+    target = (root / name).resolve()
+    if target != root and root not in target.parents:
+        raise ValueError(f"Unsafe path in archive: {name}")
+    return target
+
+
+def _extract_zip_members(archive_path, root, members):
+    # Every worker needs its own handle, ZipFile objects can't be shared between threads
+    with zipfile.ZipFile(archive_path) as z:
+        for member in members:
+            target = _safe_target(root, member.filename)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with z.open(member) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            mode = (member.external_attr >> 16) & 0o777
+            if mode:
+                os.chmod(target, mode)
+
+
+def extract_zip(archive_path, target_dir, workers=EXTRACT_WORKERS):
+    """
+    Extracts a zip archive with its members spread over `workers` threads.
+    Unix permission bits stored in the archive (executables!) are kept.
+    """
+    root = Path(target_dir).resolve()
+    with zipfile.ZipFile(archive_path) as z:
+        members = z.infolist()
+    for member in members:
+        target = _safe_target(root, member.filename)
+        if member.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+    files = [m for m in members if not m.is_dir()]
+    # Biggest first so one huge member doesn't end up last
+    files.sort(key=lambda m: m.file_size, reverse=True)
+    chunks = [files[i::workers] for i in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(_extract_zip_members, archive_path, root, chunk) for chunk in chunks if chunk]:
+            future.result()
+
+
+def extract_tar_stream(fileobj, target_dir):
+    """
+    Extracts a (compressed) tar archive while reading it from fileobj, front to back,
+    so it can come straight off a download. The "data" filter rejects absolute paths,
+    traversal and links leaving target_dir, and keeps executable bits.
+    """
+    with tarfile.open(fileobj=fileobj, mode="r|*") as t:
+        for member in t:
+            t.extract(member, target_dir, filter="data")
+
+
+def _move_into(staging, target_dir):
+    for item in staging.iterdir():
+        dest = target_dir / item.name
+        if dest.is_dir() and not dest.is_symlink():
+            shutil.rmtree(dest)
+        elif dest.exists() or dest.is_symlink():
+            dest.unlink()
+        os.replace(item, dest)
+
+
+def install_java_archive(url, target_dir, archive_path, segments=4, workers=EXTRACT_WORKERS):
+    """
+    Downloads and extracts a Java runtime archive into target_dir.
+    A .tar.gz is unpacked straight off the download stream (no archive on disk,
+    extraction overlaps the download). A .zip needs random access, so it is downloaded
+    to archive_path first, extracted in parallel and then deleted.
+    Everything is unpacked into a hidden staging folder and moved into place at the end,
+    so an interrupted install never looks like a usable runtime. A broken tar stream is
+    retried from the start (see downloader.should_retry); an archive with unsafe members
+    (see _safe_target and extract_tar_stream) is not.
+    """
+    target_dir = Path(target_dir)
+    archive_path = Path(archive_path)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=target_dir, prefix=".extract-"))
+    try:
+        if archive_path.suffix == ".zip":
+            download_resumable(url, archive_path, segments=segments)
+            try:
+                extract_zip(archive_path, staging, workers)
+            finally:
+                archive_path.unlink(missing_ok=True)
+        else:
+            for attempt in range(DEFAULT_RETRIES + 1):
+                try:
+                    with open_url(url) as resp:
+                        extract_tar_stream(resp, staging)
+                    break
+                except tarfile.FilterError:
+                    # Downloading it again won't make it safe
+                    raise
+                except (OSError, EOFError, tarfile.TarError) as e:
+                    if not should_retry(e, attempt, DEFAULT_RETRIES):
+                        raise
+                    shutil.rmtree(staging)
+                    staging.mkdir()
+        _move_into(staging, target_dir)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import platform
+import re
+from pathlib import Path
+
+from libraries import classpath_libraries, get_os_name, resolve_libraries, rules_allow
+
+# Bump when the template format changes so old cached templates get rebuilt
+TEMPLATE_VERSION = 1
+LAUNCH_MANIFEST_VERSION = 2
+# -XX:+AutoCreateSharedArchive needs JDK 19+
+CDS_MIN_JAVA = 19
+# @argfiles need JDK 9+
+ARGFILE_MIN_JAVA = 9
+VAR = re.compile(r"\$\{([^}]+)\}")
+# Very old versions only have "minecraftArguments" and rely on the launcher for these
+LEGACY_JVM_ARGS = ["-Djava.library.path=${natives_directory}", "-cp", "${classpath}"]
+
+_memo = {}
+
+
+def _split(arg):
+    """
+    "--x=${a}/${b}" -> "--x=" , "a", "/", "b", ""  (literals at even, variable names at odd indices).
+    A string without variables stays a plain string.
+    """
+    parts = VAR.split(arg)
+    return arg if len(parts) == 1 else parts
+
+
+def _compile_args(entries, features):
+    args = []
+    for entry in entries:
+        if isinstance(entry, str):
+            args.append(_split(entry))
+        elif rules_allow(entry.get("rules"), features):
+            value = entry["value"]
+            for v in value if isinstance(value, list) else [value]:
+                args.append(_split(v))
+    return args
+
+
+def compile_template(json_data, features=None):
+    """
+    Parses a version JSON's arguments once: rules are evaluated for this host and the
+    given features, and every argument is pre-split around its ${var} placeholders.
+    """
+    features = features or {}
+    arguments = json_data.get("arguments", {})
+    if arguments:
+        jvm = _compile_args(arguments.get("jvm", []), features)
+        game = _compile_args(arguments.get("game", []), features)
+    else:
+        jvm = _compile_args(LEGACY_JVM_ARGS, features)
+        game = _compile_args(json_data.get("minecraftArguments", "").split(), features)
+    return {"main_class": json_data["mainClass"], "jvm": jvm, "game": game}
+
+
+def _render_args(args, variables):
+    out = []
+    for arg in args:
+        if isinstance(arg, str):
+            out.append(arg)
+        else:
+            out.append("".join([p if i % 2 == 0 else str(variables.get(p, "")) for i, p in enumerate(arg)]))
+    return out
+
+
+def render(template, java_path, variables):
+    """
+    Substitutes the per-launch variables into a compiled template (one pass per argument).
+    """
+    return [
+        str(java_path),
+        *_render_args(template["jvm"], variables),
+        template["main_class"],
+        *_render_args(template["game"], variables),
+    ]
+
+
+def _template_key(json_hash, features):
+    rule_features = {k: v for k, v in (features or {}).items() if isinstance(v, bool)}
+    host = [get_os_name(), platform.machine().lower(), platform.release()]
+    return hashlib.sha1(json.dumps([TEMPLATE_VERSION, json_hash, rule_features, host], sort_keys=True).encode()).hexdigest()
+
+
+def load_template(json_path, features=None):
+    """
+    Returns the compiled template of a version JSON.
+    Templates are cached next to the JSON as <id>.launch.json, keyed by the JSON's SHA-1,
+    the rule features and the host. The JSON's mtime/size is checked first so a cached
+    template is used without reading (or hashing) the JSON at all.
+    """
+    json_path = Path(json_path)
+    st = json_path.stat()
+    stamp = [st.st_mtime_ns, st.st_size]
+    memo_key = (str(json_path), tuple(stamp), json.dumps(features or {}, sort_keys=True, default=str))
+    if memo_key in _memo:
+        return _memo[memo_key]
+
+    cache_path = json_path.with_name(json_path.stem + ".launch.json")
+    cached = None
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if cached and cached.get("stamp") == stamp and cached.get("key") == _template_key(cached.get("json_sha1"), features):
+        template = cached["template"]
+    else:
+        raw = json_path.read_bytes()
+        json_hash = hashlib.sha1(raw).hexdigest()
+        key = _template_key(json_hash, features)
+        if cached and cached.get("key") == key:
+            template = cached["template"]
+        else:
+            template = compile_template(json.loads(raw), features)
+        tmp = cache_path.with_name(cache_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "json_sha1": json_hash, "stamp": stamp, "template": template}, f)
+        os.replace(tmp, cache_path)
+
+    _memo[memo_key] = template
+    return template
+
+
+def build_launch_command(java_path, json_path, variables, features=None):
+    """
+    Build the full Java launch command for the version JSON at json_path.
+    """
+    return render(load_template(json_path, features), java_path, variables)
+
+
+def _write_json(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def build_launch_manifest(version_folder, json_data, libraries_dir, features=None):
+    """
+    Resolves everything a launch of this version needs (classpath, natives directory,
+    main class) and records size/mtime of every jar, in <id>.classpath.json.
+    Paths are absolute, so the game can run from any working directory (its game dir).
+    Run at install time; missing jars are left out of the stats and reported by
+    prepare_launch.
+    """
+    version_folder = Path(version_folder).resolve()
+    version_id = version_folder.name
+    libraries_dir = Path(libraries_dir).resolve()
+    classpath = [str(lib["path"]) for lib in classpath_libraries(resolve_libraries(json_data, libraries_dir, features))]
+    # The client jar goes LAST
+    classpath.append(str(version_folder / f"{version_id}.jar"))
+    files = []
+    for path in classpath:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        files.append([path, st.st_size, st.st_mtime_ns])
+    manifest = {
+        "version": LAUNCH_MANIFEST_VERSION,
+        "classpath": classpath,
+        "natives_directory": str(version_folder / "natives"),
+        "main_class": json_data["mainClass"],
+        "files": files,
+    }
+    _write_json(version_folder / f"{version_id}.classpath.json", manifest)
+    return manifest
+
+
+def _stale_files(manifest):
+    """
+    Stat-only check of the recorded jars: returns the ones missing or changed.
+    """
+    stale = []
+    if len(manifest["files"]) != len(manifest["classpath"]):
+        stale.extend(set(manifest["classpath"]) - {f[0] for f in manifest["files"]})
+    for path, size, mtime in manifest["files"]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            stale.append(path)
+            continue
+        if st.st_size != size or st.st_mtime_ns != mtime:
+            stale.append(path)
+    return stale
+
+
+def prepare_launch(version_folder, json_data, libraries_dir, features=None):
+    """
+    Returns (launch manifest, missing jars) for a version.
+    The stored manifest is used when every jar still has its recorded size/mtime;
+    otherwise it is rebuilt, and whatever is still missing is returned.
+    """
+    version_folder = Path(version_folder)
+    path = version_folder / f"{version_folder.name}.classpath.json"
+    manifest = None
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        pass
+    if manifest and manifest.get("version") == LAUNCH_MANIFEST_VERSION and not _stale_files(manifest):
+        return manifest, []
+    manifest = build_launch_manifest(version_folder, json_data, libraries_dir, features)
+    return manifest, _stale_files(manifest)
+
+
+def _argfile_quote(arg):
+    return '"' + arg.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def apply_jvm_speedups(cmd, version_folder, java_major, argfile=True, cds=False):
+    """
+    Optional launch speedups for a built command:
+    argfile moves "-cp <classpath>" into <id>.args (passed as @file, JDK 9+), which keeps
+    the command line short; cds adds an AppCDS archive (<id>.jsa) that the JVM creates on
+    the first launch and maps on the next ones (JDK 19+).
+    """
+    version_folder = Path(version_folder)
+    version_id = version_folder.name
+    cmd = list(cmd)
+    if argfile and java_major and java_major >= ARGFILE_MIN_JAVA and "-cp" in cmd:
+        i = cmd.index("-cp")
+        args_path = version_folder / f"{version_id}.args"
+        content = f"-cp {_argfile_quote(cmd[i + 1])}\n"
+        try:
+            unchanged = args_path.read_text(encoding="utf-8") == content
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            args_path.write_text(content, encoding="utf-8")
+        cmd[i:i + 2] = [f"@{args_path}"]
+    if cds and java_major and java_major >= CDS_MIN_JAVA:
+        cmd[1:1] = ["-XX:+AutoCreateSharedArchive", f"-XX:SharedArchiveFile={version_folder / f'{version_id}.jsa'}"]
+    return cmd
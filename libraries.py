@@ -0,0 +1,171 @@
+import platform
+import re
+import shutil
+import zipfile
+from pathlib import Path
+
+import metrics
+from downloader import is_complete
+from store import fetch_to_store
+
+# ---------------- CONFIG ----------------
+LIBRARIES_BASE_URL = "https://libraries.minecraft.net/"
+# ----------------------------------------
+
+
+def get_os_name():
+    p = platform.system().lower()
+    if "windows" in p:
+        return "windows"
+    if "darwin" in p or "mac" in p:
+        return "osx"
+    return "linux"
+
+
+def get_arch_bits():
+    return "64" if platform.machine().endswith("64") else "32"
+
+
+def rule_matches(rule, features):
+    os_rule = rule.get("os", {})
+    if "name" in os_rule and os_rule["name"] != get_os_name():
+        return False
+    if "arch" in os_rule:
+        if os_rule["arch"] == "x86" and get_arch_bits() != "32":
+            return False
+        if os_rule["arch"] != "x86" and os_rule["arch"] not in platform.machine().lower():
+            return False
+    if "version" in os_rule and not re.search(os_rule["version"], platform.release()):
+        return False
+    for k, v in rule.get("features", {}).items():
+        if features.get(k, False) != v:
+            return False
+    return True
+
+
+def rules_allow(rules, features):
+    """
+    Mojang rule semantics: without rules everything is allowed, otherwise the
+    last matching rule decides and nothing matching means disallowed.
+    """
+    if not rules:
+        return True
+    allowed = False
+    for rule in rules:
+        if rule_matches(rule, features):
+            allowed = rule.get("action") == "allow"
+    return allowed
+
+
+def maven_path(name, classifier=None):
+    """
+    "group:artifact:version[:classifier]" -> "group/path/artifact/version/artifact-version[-classifier].jar"
+    """
+    parts = name.split(":")
+    group, artifact, version = parts[:3]
+    if classifier is None and len(parts) > 3:
+        classifier = parts[3]
+    file_name = f"{artifact}-{version}" + (f"-{classifier}" if classifier else "") + ".jar"
+    return "/".join([*group.split("."), artifact, version, file_name])
+
+
+def resolve_libraries(json_data, libraries_dir, features=None):
+    """
+    Turns a version JSON's "libraries" into the list of files this host needs, as dicts with
+    path, url, sha1, size, classpath (goes on the classpath), native (gets extracted into the
+    natives directory) and exclude.
+    Rules are evaluated for this OS, the matching natives classifier is picked, and
+    entries that resolve to the same file are merged.
+    """
+    features = features or {}
+    libraries_dir = Path(libraries_dir)
+    resolved = {}
+
+    def add(artifact, classpath, native, exclude):
+        path = libraries_dir / artifact["path"]
+        if path in resolved:
+            resolved[path]["classpath"] = resolved[path]["classpath"] or classpath
+            resolved[path]["native"] = resolved[path]["native"] or native
+            return
+        resolved[path] = {
+            "path": path,
+            "url": artifact.get("url"),
+            "sha1": artifact.get("sha1"),
+            "size": artifact.get("size"),
+            "classpath": classpath,
+            "native": native,
+            "exclude": exclude,
+        }
+
+    for lib in json_data.get("libraries", []):
+        if not rules_allow(lib.get("rules"), features):
+            continue
+        exclude = lib.get("extract", {}).get("exclude", [])
+        downloads = lib.get("downloads")
+        name = lib.get("name", "")
+        # 1.19+ ship natives as their own rule-guarded entries, e.g. "...:natives-linux"
+        name_classifier = name.split(":")[3] if name.count(":") >= 3 else ""
+        is_native_entry = name_classifier.startswith("natives-")
+
+        if downloads is None:
+            # Old or third-party entries only have a maven name and an optional repository url
+            path = maven_path(name)
+            add({"path": path, "url": lib.get("url", LIBRARIES_BASE_URL) + path}, True, is_native_entry, exclude)
+        elif downloads.get("artifact"):
+            add(downloads["artifact"], True, is_native_entry, exclude)
+
+        natives = lib.get("natives", {})
+        if get_os_name() in natives:
+            classifier = natives[get_os_name()].replace("${arch}", get_arch_bits())
+            artifact = downloads.get("classifiers", {}).get(classifier) if downloads else None
+            if artifact is None:
+                path = maven_path(name, classifier)
+                artifact = {"path": path, "url": lib.get("url", LIBRARIES_BASE_URL) + path}
+            add(artifact, False, True, exclude)
+
+    return list(resolved.values())
+
+
+def classpath_libraries(libs):
+    return [lib for lib in libs if lib["classpath"]]
+
+
+def missing_libraries(libs):
+    """
+    The resolved libraries that are not on disk (or have the wrong size), with their folders created.
+    """
+    missing = [lib for lib in libs if not is_complete(lib["path"], lib["size"])]
+    metrics.CACHE.inc(len(libs) - len(missing), cache="libraries", result="hit")
+    metrics.CACHE.inc(len(missing), cache="libraries", result="miss")
+    for parent in {lib["path"].parent for lib in missing}:
+        parent.mkdir(parents=True, exist_ok=True)
+    return missing
+
+
+def download_library(lib, store_dir=None):
+    fetch_to_store(lib["url"], lib["path"], sha1=lib["sha1"], size=lib["size"], store_dir=store_dir)
+
+
+def extract_natives(libs, natives_dir):
+    """
+    Unpacks the native libraries (.so/.dll/.dylib...) of the resolved set into natives_dir,
+    honouring each library's "extract.exclude" prefixes.
+    """
+    natives_dir = Path(natives_dir)
+    natives_dir.mkdir(parents=True, exist_ok=True)
+    root = natives_dir.resolve()
+    for lib in libs:
+        if not lib["native"]:
+            continue
+        with zipfile.ZipFile(lib["path"]) as z:
+            for member in z.infolist():
+                if member.is_dir() or any(member.filename.startswith(e) for e in lib["exclude"]):
+                    continue
+                if member.filename.startswith("META-INF/"):
+                    continue
+                target = (natives_dir / member.filename).resolve()
+                if root not in target.parents:
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with z.open(member) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
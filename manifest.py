@@ -0,0 +1,207 @@
+import bisect
+import heapq
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+import metrics
+from downloader import download_file, open_url
+
+# ---------------- CONFIG ----------------
+MANIFEST_URL = "https://piston-meta.mojang.com/mc/game/version_manifest.json"
+DEFAULT_TTL = 600  # seconds a cached manifest is used without asking the server
+# ----------------------------------------
+
+
+def _write_atomic(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def ensure_manifest(cache_dir, url=MANIFEST_URL, ttl=DEFAULT_TTL, offline=False):
+    """
+    Makes sure cache_dir holds a usable copy of the version manifest and returns its path.
+    A cached copy younger than `ttl` seconds is used as is; an older one is revalidated
+    with If-None-Match/If-Modified-Since. When offline, or when the server can't be
+    reached, the cached copy is used whatever its age.
+    Returns None if there is neither network nor cache.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = cache_dir / "version_manifest.json"
+    meta_path = cache_dir / "version_manifest.meta.json"
+    meta = _read_meta(meta_path)
+    # A cache of another manifest_url is useless
+    if meta.get("url") != url:
+        meta = {}
+    cached = manifest_path.exists() and bool(meta)
+
+    if cached and (offline or time.time() - meta.get("fetched_at", 0) < ttl):
+        metrics.CACHE.inc(cache="manifest", result="hit")
+        return manifest_path
+    if offline:
+        return None
+
+    headers = {}
+    if cached and meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if cached and meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    try:
+        with open_url(url, headers, ok=(200, 304)) as resp:
+            status = resp.status
+            body = resp.read()
+            etag = resp.getheader("ETag")
+            last_modified = resp.getheader("Last-Modified")
+    except Exception:
+        # No network, fall back to the stale copy without marking it fresh
+        metrics.CACHE.inc(cache="manifest", result="stale")
+        return manifest_path if cached else None
+
+    metrics.CACHE.inc(cache="manifest", result="miss" if status == 200 else "revalidated")
+    if status == 200:
+        json.loads(body)  # don't cache a broken manifest
+        _write_atomic(manifest_path, body)
+    else:
+        etag = etag or meta.get("etag")
+        last_modified = last_modified or meta.get("last_modified")
+    meta = {"url": url, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()}
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+    return manifest_path
+
+
+class ManifestIndex:
+    """
+    Column-oriented view of a version manifest.
+    Versions are kept newest first (by releaseTime), with per-type position buckets,
+    an id -> position map and a sorted id list for prefix search.
+    """
+
+    FIELDS = ("id", "type", "url", "time", "releaseTime", "sha1")
+
+    def __init__(self, columns, buckets, sorted_ids):
+        self.columns = columns
+        self.buckets = buckets
+        self.sorted_ids = sorted_ids
+        self.positions = {version_id: i for i, version_id in enumerate(columns["id"])}
+        self._filtered = {}
+
+    @classmethod
+    def build(cls, manifest):
+        versions = sorted(manifest["versions"], key=lambda v: v.get("releaseTime", ""), reverse=True)
+        columns = {field: [v.get(field) for v in versions] for field in cls.FIELDS}
+        buckets = {}
+        for i, version_type in enumerate(columns["type"]):
+            buckets.setdefault(version_type, []).append(i)
+        return cls(columns, buckets, sorted(columns["id"]))
+
+    def to_json(self):
+        return {"columns": self.columns, "buckets": self.buckets, "sorted_ids": self.sorted_ids}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["columns"], data["buckets"], data["sorted_ids"])
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def entry(self, i):
+        entry = {field: self.columns[field][i] for field in self.FIELDS}
+        if entry["sha1"] is None:
+            del entry["sha1"]
+        return entry
+
+    def get(self, version_id):
+        i = self.positions.get(version_id)
+        return None if i is None else self.entry(i)
+
+    def filtered(self, types):
+        """
+        Entries of the given types, newest first. Cached per set of types.
+        """
+        key = frozenset(types)
+        if key not in self._filtered:
+            positions = heapq.merge(*(self.buckets.get(t, []) for t in key))
+            self._filtered[key] = [self.entry(i) for i in positions]
+        return self._filtered[key]
+
+    def search(self, prefix):
+        """
+        Ids starting with prefix, in id order.
+        """
+        start = bisect.bisect_left(self.sorted_ids, prefix)
+        found = []
+        for version_id in self.sorted_ids[start:]:
+            if not version_id.startswith(prefix):
+                break
+            found.append(version_id)
+        return found
+
+
+_loaded = {}  # index path -> (stamp, ManifestIndex), kept for the life of the process
+
+
+def load_manifest_index(cache_dir, url=MANIFEST_URL, ttl=DEFAULT_TTL, offline=False):
+    """
+    Returns a ManifestIndex for the cached manifest (see ensure_manifest), or None.
+    The index is stored in cache_dir/version_manifest.index.json and only rebuilt when
+    the cached manifest file changes. It is also kept in memory, so while the manifest is
+    unchanged later calls return the same index (and its filtered() cache) without
+    reading anything.
+    """
+    manifest_path = ensure_manifest(cache_dir, url, ttl, offline)
+    if manifest_path is None:
+        return None
+    st = manifest_path.stat()
+    stamp = [st.st_mtime_ns, st.st_size]
+    index_path = manifest_path.with_name("version_manifest.index.json")
+    key = str(index_path.resolve())
+    loaded = _loaded.get(key)
+    if loaded is not None and loaded[0] == stamp:
+        return loaded[1]
+    index = None
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("stamp") == stamp:
+            index = ManifestIndex.from_json(data)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    if index is None:
+        with open(manifest_path, encoding="utf-8") as f:
+            index = ManifestIndex.build(json.load(f))
+        data = index.to_json()
+        data["stamp"] = stamp
+        _write_atomic(index_path, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+    _loaded[key] = (stamp, index)
+    return index
+
+
+def save_version_json(version, json_path, cache_dir, offline=False):
+    """
+    Writes the version JSON of a manifest entry to json_path.
+    The copy cached in cache_dir/versions is reused while the manifest entry is unchanged
+    (same sha1, or same "time" for manifests without one), which is also what makes
+    installs work offline.
+    """
+    stamp = version.get("sha1") or re.sub(r"\W", "", version.get("time", ""))
+    cache_path = Path(cache_dir) / "versions" / f"{version['id']}-{stamp}.json"
+    if not cache_path.exists():
+        if offline:
+            raise OSError(f"Version {version['id']} is not cached and the launcher is offline")
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        download_file(version["url"], cache_path, sha1=version.get("sha1"))
+    _write_atomic(Path(json_path), cache_path.read_bytes())
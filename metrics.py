@@ -0,0 +1,167 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# ---------------- CONFIG ----------------
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+# ----------------------------------------
+
+_lock = threading.Lock()
+_metrics = {}
+_started = time.time()
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+
+    def inc(self, n=1, **labels):
+        key = _label_key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + n
+
+    def value(self, **labels):
+        return self.values.get(_label_key(labels), 0)
+
+    def total(self):
+        with _lock:
+            return sum(self.values.values())
+
+    def snapshot(self):
+        return [{"labels": dict(key), "value": value} for key, value in self.values.items()]
+
+    def prometheus(self):
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in self.values.items()]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.values = {}  # label key -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with _lock:
+            data = self.values.get(key)
+            if data is None:
+                data = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            data[bisect.bisect_left(self.buckets, value)] += 1
+            data[-1] += value
+
+    def snapshot(self):
+        out = []
+        for key, data in self.values.items():
+            count = sum(data[:-1])
+            out.append({"labels": dict(key), "count": count, "sum": data[-1],
+                        "buckets": dict(zip([*map(str, self.buckets), "+Inf"], data[:-1]))})
+        return out
+
+    def prometheus(self):
+        lines = []
+        for key, data in self.values.items():
+            cumulative = 0
+            for bound, n in zip([*map(str, self.buckets), "+Inf"], data[:-1]):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {data[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+def counter(name, help_text=""):
+    with _lock:
+        if name not in _metrics:
+            _metrics[name] = Counter(name, help_text)
+        return _metrics[name]
+
+
+def histogram(name, help_text="", buckets=LATENCY_BUCKETS):
+    with _lock:
+        if name not in _metrics:
+            _metrics[name] = Histogram(name, help_text, buckets)
+        return _metrics[name]
+
+
+# The metrics the download path reports
+BYTES = counter("pml_download_bytes_total", "Bytes downloaded")
+FILES = counter("pml_download_files_total", "Files downloaded and verified")
+RETRIES = counter("pml_download_retries_total", "Download attempts that were retried")
+REQUESTS = counter("pml_http_requests_total", "HTTP responses received, by host and status")
+CACHE = counter("pml_cache_lookups_total", "Cache lookups, by cache and result (hit/miss)")
+LATENCY = histogram("pml_http_latency_seconds", "Time to response headers, by host")
+STAGES = histogram("pml_install_stage_seconds", "Wall time of each install stage", STAGE_BUCKETS)
+
+
+@contextmanager
+def timed_stage(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGES.observe(time.perf_counter() - start, stage=stage)
+
+
+def snapshot():
+    """
+    All metrics as a JSON-able dict, plus the overall bytes/s and files/s since start.
+    """
+    elapsed = time.time() - _started
+    with _lock:
+        data = {name: {"type": m.kind, "values": m.snapshot()} for name, m in _metrics.items()}
+    return {
+        "time": time.time(),
+        "uptime": elapsed,
+        "bytes_per_s": BYTES.total() / elapsed if elapsed else 0.0,
+        "files_per_s": FILES.total() / elapsed if elapsed else 0.0,
+        "metrics": data,
+    }
+
+
+def write_jsonl(path, **extra):
+    """
+    Appends one snapshot line to a JSON lines file. extra keys are added to the line.
+    """
+    line = snapshot()
+    line.update(extra)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(line) + "\n")
+
+
+def prometheus_text():
+    lines = []
+    with _lock:
+        for name, m in _metrics.items():
+            lines.append(f"# HELP {name} {m.help}")
+            lines.append(f"# TYPE {name} {m.kind}")
+            lines.extend(m.prometheus())
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
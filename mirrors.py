@@ -0,0 +1,99 @@
+import threading
+import time
+import urllib.parse
+
+# ---------------- CONFIG ----------------
+EWMA_WEIGHT = 0.3  # weight of the newest latency sample
+FAILURE_PENALTY = 5.0  # seconds added to a mirror's score per failure in a row
+MAX_FAILURES = 3  # failures in a row after which a mirror is left out...
+RETRY_AFTER = 60.0  # ...for this many seconds
+# ----------------------------------------
+
+# A mirror is a base URL, in one of two layouts:
+#   {"url": "http://lan:8080"}  serves every host as <url>/<host>/<path> (what serve-cache offers)
+#   {"url": "https://mirror.example/assets", "hosts": ["resources.download.minecraft.net"]}
+#                               serves only those hosts, as <url>/<path>
+# Mirrors are tried before the original URL, best score (lowest latency) first; the
+# original URL is always the last resort.
+
+_lock = threading.Lock()
+_mirrors = []
+# mirror url -> {"latency": ewma seconds or None, "failures": failures in a row,
+#                "retry_at": monotonic time before which the mirror is left out}
+_scores = {}
+
+
+def set_mirrors(mirrors):
+    """
+    Replaces the configured mirrors: a list of base URLs (every host, serve-cache layout)
+    and/or {"url": ..., "hosts": [...]} dicts.
+    """
+    parsed = []
+    for mirror in mirrors or []:
+        if isinstance(mirror, str):
+            mirror = {"url": mirror}
+        hosts = mirror.get("hosts")
+        parsed.append({"url": mirror["url"].rstrip("/"), "hosts": set(hosts) if hosts else None})
+    with _lock:
+        _mirrors[:] = parsed
+        _scores.clear()
+        for mirror in parsed:
+            _scores[mirror["url"]] = {"latency": None, "failures": 0, "retry_at": 0.0}
+
+
+def _score(mirror_url):
+    score = _scores[mirror_url]
+    # Untried mirrors go first so every mirror gets measured
+    return (score["latency"] or 0.0) + score["failures"] * FAILURE_PENALTY
+
+
+def candidates(url, skip=()):
+    """
+    [(mirror url or None, url to fetch)] for url: matching mirrors best first, then url itself.
+    Mirrors that keep failing are left out until RETRY_AFTER has passed, the ones in skip
+    altogether.
+    """
+    if not _mirrors:
+        return [(None, url)]
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path
+    if parts.query:
+        path += "?" + parts.query
+    now = time.monotonic()
+    with _lock:
+        matching = [m for m in _mirrors if (m["hosts"] is None or parts.netloc in m["hosts"])
+                    and _scores[m["url"]]["retry_at"] <= now and m["url"] not in skip]
+        matching.sort(key=lambda m: _score(m["url"]))
+    out = []
+    for mirror in matching:
+        if mirror["hosts"] is None:
+            out.append((mirror["url"], f"{mirror['url']}/{parts.netloc}{path}"))
+        else:
+            out.append((mirror["url"], mirror["url"] + path))
+    out.append((None, url))
+    return out
+
+
+def record(mirror_url, seconds=None):
+    """
+    Records a response time for a mirror, or a failure with seconds=None.
+    """
+    if mirror_url is None:
+        return
+    with _lock:
+        score = _scores.get(mirror_url)
+        if score is None:
+            return
+        if seconds is None:
+            score["failures"] += 1
+            if score["failures"] >= MAX_FAILURES:
+                score["retry_at"] = time.monotonic() + RETRY_AFTER
+        else:
+            score["failures"] = 0
+            latency = score["latency"]
+            score["latency"] = seconds if latency is None else latency + EWMA_WEIGHT * (seconds - latency)
+
+
+def scores():
+    with _lock:
+        return {url: dict(score) for url, score in _scores.items()}
@@ -0,0 +1,91 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# ---------------- CONFIG ----------------
+INDEX_VERSION = 1
+SCAN_WORKERS = 16
+# ----------------------------------------
+
+# Objects are only ever renamed into place once complete (see downloader._stream_to_file),
+# so a file named like a hash in objects/<hash[:2]>/ is a finished object. Partial downloads
+# are dot files and are skipped.
+SHARDS = [f"{i:02x}" for i in range(256)]
+
+
+def _is_hash(name):
+    return len(name) == 40 and not name.startswith(".")
+
+
+def _scan_shard(shard_dir, sizes):
+    """
+    {hash: size} of one shard folder (size is None without sizes). Missing folder -> {}.
+    """
+    found = {}
+    try:
+        with os.scandir(shard_dir) as it:
+            for entry in it:
+                if _is_hash(entry.name) and entry.is_file():
+                    found[entry.name] = entry.stat().st_size if sizes else None
+    except FileNotFoundError:
+        pass
+    return found
+
+
+def _shard_mtime(shard_dir):
+    try:
+        return os.stat(shard_dir).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def scan_objects(objects_dir, workers=SCAN_WORKERS, sizes=False):
+    """
+    Lists the 256 shard folders of objects_dir in parallel and returns {hash: size}
+    for every object on disk. Sizes cost one stat() per object, so they are only
+    read with sizes=True (otherwise every size is None).
+    """
+    objects_dir = Path(objects_dir)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        shards = pool.map(lambda shard: _scan_shard(objects_dir / shard, sizes), SHARDS)
+        found = {}
+        for shard in shards:
+            found.update(shard)
+    return found
+
+
+def load_object_index(objects_dir, index_path, workers=SCAN_WORKERS, sizes=True):
+    """
+    Like scan_objects, but kept in index_path between runs: a shard folder is only
+    listed again when its mtime changed (an object was added or removed), so an
+    unchanged store costs 256 stat() calls.
+    """
+    objects_dir = Path(objects_dir)
+    index_path = Path(index_path)
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION or data.get("sizes") != sizes:
+            data = None
+    except (OSError, ValueError):
+        data = None
+    shards = data["shards"] if data else {}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        mtimes = dict(zip(SHARDS, pool.map(lambda shard: _shard_mtime(objects_dir / shard), SHARDS)))
+        stale = [shard for shard in SHARDS if shards.get(shard, [None])[0] != mtimes[shard]]
+        for shard, found in zip(stale, pool.map(lambda shard: _scan_shard(objects_dir / shard, sizes), stale)):
+            shards[shard] = [mtimes[shard], found]
+
+    if stale:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_name(index_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "sizes": sizes, "shards": shards}, f, separators=(",", ":"))
+        os.replace(tmp, index_path)
+
+    found = {}
+    for _, objects in shards.values():
+        found.update(objects)
+    return found
@@ -0,0 +1,201 @@
+import collections
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+import api
+from accounts import make_account
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ---------------- CONFIG ----------------
+DEFAULT_MAX_RUNNING = 4
+SAMPLE_INTERVAL = 1.0  # seconds between CPU/RSS samples
+TAIL_LINES = 50  # output lines kept per instance for the report
+# ----------------------------------------
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def sample_process(pid):
+    """
+    (cpu seconds, rss bytes) of a running process, or None when it can't be read.
+    Reads /proc on Linux, uses psutil elsewhere if it is installed.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            # The command name can contain spaces, the fields after it can't
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS  # utime + stime
+        return cpu, int(fields[21]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    if psutil is not None:
+        try:
+            proc = psutil.Process(pid)
+            times = proc.cpu_times()
+            return times.user + times.system, proc.memory_info().rss
+        except psutil.Error:
+            pass
+    return None
+
+
+def _pump(stream, log_file, tail):
+    # One thread per pipe, so a chatty game never blocks on a full pipe
+    with stream:
+        for line in iter(stream.readline, b""):
+            log_file.write(line)
+            log_file.flush()
+            tail.append(line.decode("utf-8", errors="replace").rstrip("\n"))
+
+
+class Instance:
+    """
+    One game process: the spec it was started from, its output and resource samples.
+    """
+
+    def __init__(self, name, spec, cmd, game_dir):
+        self.name = name
+        self.spec = spec
+        self.cmd = cmd
+        self.game_dir = game_dir
+        self.proc = None
+        self.started = None
+        self.ended = None
+        self.samples = []  # (seconds since start, cpu seconds, rss bytes)
+        self.tail = collections.deque(maxlen=TAIL_LINES)
+        self._threads = []
+        self._log = None
+
+    def start(self):
+        self.game_dir.mkdir(parents=True, exist_ok=True)
+        self._log = open(self.game_dir / "launcher_output.log", "ab")
+        self.proc = subprocess.Popen(self.cmd, cwd=self.game_dir, stdin=subprocess.DEVNULL,
+                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.started = time.perf_counter()
+        for stream in (self.proc.stdout, self.proc.stderr):
+            thread = threading.Thread(target=_pump, args=(stream, self._log, self.tail), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def sample(self):
+        sample = sample_process(self.proc.pid)
+        if sample is not None:
+            self.samples.append((time.perf_counter() - self.started, *sample))
+
+    def poll(self):
+        """
+        True once the process has exited (and its output is collected).
+        """
+        if self.proc.poll() is None:
+            return False
+        self.ended = time.perf_counter()
+        for thread in self._threads:
+            # Output a leftover child process keeps writing is not waited for
+            thread.join(5.0)
+        self._log.close()
+        return True
+
+    def report(self):
+        return {
+            "name": self.name,
+            "game_dir": str(self.game_dir),
+            "returncode": self.proc.returncode if self.proc else None,
+            "seconds": (self.ended or time.perf_counter()) - self.started if self.started else 0.0,
+            "cpu_seconds": self.samples[-1][1] if self.samples else None,
+            "peak_rss": max(s[2] for s in self.samples) if self.samples else None,
+            "samples": self.samples,
+            "tail": list(self.tail),
+        }
+
+
+def _spec_version(spec):
+    version = spec["version"]
+    # A plain id, or a selected_version entry of the launcher config
+    return version["id"] if isinstance(version, dict) else version
+
+
+def _spec_account(spec):
+    account = spec["account"]
+    if isinstance(account, str):
+        return make_account(account)
+    return account
+
+
+def run_instances(specs, base_dir=api.BASE_DIR, max_running=DEFAULT_MAX_RUNNING, sample_interval=SAMPLE_INTERVAL,
+                  instances_dir=None, **launch_kwargs):
+    """
+    Starts one game per spec, at most max_running at a time, and waits for all of them.
+
+    A spec is a dict with "version" (an id or a selected_version entry), "account"
+    (a username or a selected_account entry) and optionally "game_dir" and "max_ram".
+    Every instance reads the version, libraries and assets from base_dir and gets its own
+    game directory (default: instances_dir/<n>-<username>, instances_dir defaulting to
+    base_dir/instances), where its stdout/stderr go to launcher_output.log.
+    CPU time and RSS of every running game are sampled every sample_interval seconds.
+    launch_kwargs go to api.launch_command (java_path, features, argfile, ...).
+
+    Returns one report dict per spec, in order: name, game_dir, returncode (None if it
+    couldn't be started), seconds, cpu_seconds, peak_rss, samples, tail (last output
+    lines) and error.
+    """
+    base_dir = Path(base_dir).resolve()
+    instances_dir = Path(instances_dir).resolve() if instances_dir else base_dir / "instances"
+    reports = [None] * len(specs)
+    queue = collections.deque(enumerate(specs))
+    running = {}
+
+    try:
+        _run(queue, running, reports, base_dir, instances_dir, max_running, sample_interval, launch_kwargs)
+    except BaseException:
+        _stop(running.values())
+        raise
+    return reports
+
+
+def _run(queue, running, reports, base_dir, instances_dir, max_running, sample_interval, launch_kwargs):
+    while queue or running:
+        while queue and len(running) < max(1, max_running):
+            n, spec = queue.popleft()
+            account = _spec_account(spec)
+            name = f"{n}-{account['username']}"
+            game_dir = Path(spec["game_dir"]).resolve() if spec.get("game_dir") else instances_dir / name
+            try:
+                cmd = api.launch_command(_spec_version(spec), account["username"], base_dir,
+                                         user_uuid=account.get("uuid"), max_ram=spec.get("max_ram"),
+                                         game_dir=game_dir, **launch_kwargs)
+                instance = Instance(name, spec, cmd, game_dir)
+                instance.start()
+            except Exception as e:
+                reports[n] = {"name": name, "game_dir": str(game_dir), "returncode": None, "seconds": 0.0,
+                              "cpu_seconds": None, "peak_rss": None, "samples": [], "tail": [], "error": str(e)}
+                continue
+            running[n] = instance
+
+        time.sleep(sample_interval)
+        for n, instance in list(running.items()):
+            if instance.poll():
+                reports[n] = dict(instance.report(), error=None)
+                del running[n]
+            else:
+                instance.sample()
+
+
+def _stop(instances, timeout=10.0):
+    # Terminate, then kill what is still alive after timeout
+    for instance in instances:
+        if instance.proc and instance.proc.poll() is None:
+            instance.proc.terminate()
+    deadline = time.monotonic() + timeout
+    for instance in instances:
+        if instance.proc:
+            try:
+                instance.proc.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                instance.proc.kill()
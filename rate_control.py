@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+
+import metrics
+
+# ---------------- CONFIG ----------------
+MAX_PER_HOST = 16  # requests in flight to one host at most
+MIN_PER_HOST = 1
+THROTTLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+BACKOFF_BASE = 0.5  # seconds before the first retry (before jitter)
+BACKOFF_MAX = 30.0
+RETRY_BUDGET_MIN = 50  # retries always allowed...
+RETRY_BUDGET_RATIO = 0.2  # ...plus this many per successful request
+RETRY_BUDGET_MAX = 100.0
+# ----------------------------------------
+
+# Per-host concurrency follows AIMD, like TCP congestion control: a 429/5xx halves the
+# number of requests allowed in flight to that host, every success adds 1/limit, i.e.
+# about one slot per limit's worth of successes. Only requests started after the last cut
+# can cut again, so one burst of errors (all sent at the old limit) counts once.
+# Retries wait with exponential backoff and full jitter, and all of them draw from one
+# budget that successes refill, so a server that is down gets a bounded number of retries
+# instead of retries * files.
+
+
+class HostLimit:
+    def __init__(self, limit=MAX_PER_HOST):
+        self.limit = float(limit)
+        self.active = 0
+        self.throttled = 0
+        self._last_cut = 0
+        self._sequence = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """
+        Waits for a free slot and returns a ticket for release().
+        """
+        with self._cond:
+            while self.active >= int(self.limit):
+                self._cond.wait()
+            self.active += 1
+            self._sequence += 1
+            return self._sequence
+
+    def release(self, ticket, status=None):
+        """
+        Frees the slot; status is the HTTP status the request ended with (None: no response).
+        """
+        with self._cond:
+            self.active -= 1
+            if status in THROTTLE_STATUSES:
+                self.throttled += 1
+                if ticket > self._last_cut:
+                    self._last_cut = self._sequence
+                    self.limit = max(float(MIN_PER_HOST), self.limit / 2)
+            elif status is not None and status < 400:
+                self.limit = min(float(MAX_PER_HOST), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+_lock = threading.Lock()
+_hosts = {}
+_budget = float(RETRY_BUDGET_MIN)
+
+
+def host_limit(host):
+    with _lock:
+        limit = _hosts.get(host)
+        if limit is None:
+            limit = _hosts[host] = HostLimit()
+        return limit
+
+
+def record_success():
+    global _budget
+    with _lock:
+        _budget = min(RETRY_BUDGET_MAX, _budget + RETRY_BUDGET_RATIO)
+
+
+def take_retry():
+    """
+    Takes one retry from the shared budget; False when it is spent.
+    """
+    global _budget
+    with _lock:
+        if _budget < 1:
+            return False
+        _budget -= 1
+        return True
+
+
+def backoff(attempt, retry_after=None):
+    """
+    Seconds to wait before retry number attempt (0 = first retry): a random time up to
+    BACKOFF_BASE * 2**attempt, capped at BACKOFF_MAX, or the server's Retry-After if longer.
+    """
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(BACKOFF_MAX, retry_after))
+    return delay
+
+
+def wait_before_retry(attempt, retry_after=None):
+    """
+    Takes a retry from the budget and sleeps the backoff for it.
+    Returns False (without sleeping) when the budget is spent.
+    """
+    if not take_retry():
+        return False
+    metrics.RETRIES.inc()
+    time.sleep(backoff(attempt, retry_after))
+    return True
+
+
+def stats():
+    """
+    {host: {"limit": current concurrency limit, "throttled": 429/5xx responses}}.
+    """
+    with _lock:
+        return {host: {"limit": int(h.limit), "throttled": h.throttled} for host, h in _hosts.items()}
+
+
+def reset():
+    global _budget
+    with _lock:
+        _hosts.clear()
+        _budget = float(RETRY_BUDGET_MIN)
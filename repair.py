@@ -0,0 +1,208 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from downloader import ASSETS_BASE_URL, DEFAULT_WORKERS
+from installer import DEFAULT_SEGMENTS, find_version, install_many
+from manifest import DEFAULT_TTL, MANIFEST_URL, save_version_json
+from store import blob_path
+from verify import BATCH_SIZE, collect_install_files, sha1_file
+
+# ---------------- CONFIG ----------------
+JOURNAL_VERSION = 1
+# ----------------------------------------
+
+# The journal (cache/file_state.json) remembers for every checked file the SHA-1 it was
+# found to have and the (size, mtime_ns, inode) it had then. A file whose stat still
+# matches is trusted without being read again, so repairing a healthy install costs one
+# stat() per file.
+
+
+def load_journal(journal_path):
+    """
+    {path: [sha1, size, mtime_ns, inode]}, empty if the journal is missing or unreadable.
+    """
+    try:
+        with open(journal_path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != JOURNAL_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def save_journal(journal_path, files):
+    journal_path = Path(journal_path)
+    journal_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = journal_path.with_name(journal_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": JOURNAL_VERSION, "files": files}, f, separators=(",", ":"))
+    os.replace(tmp, journal_path)
+
+
+def _stamp(st):
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _readable_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            json.load(f)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def hash_files(entries):
+    """
+    Hashes a batch of (path, sha1) entries, in a worker process.
+    Returns [(path, sha1 matches, stamp)]. The stamp is taken before the file is read,
+    so a file changed while it was hashed doesn't match its journal entry later.
+    """
+    results = []
+    for path, sha1 in entries:
+        try:
+            st = os.stat(path)
+            results.append((path, sha1_file(path) == sha1.lower(), _stamp(st)))
+        except OSError:
+            results.append((path, False, None))
+    return results
+
+
+def check_install(base_dir, version_ids, journal, workers=None):
+    """
+    Diffs the files of the given installed versions against their version JSONs and asset
+    indexes by size, then by SHA-1 for the files whose journal entry doesn't match their
+    stat anymore. Updates journal in place.
+    Returns (files, bad, hashed): {path: (sha1, size)} of every expected file, a list of
+    (path, reason) for the missing and corrupt ones, and how many files were hashed.
+    """
+    files = collect_install_files(base_dir, version_ids=version_ids)
+    bad = []
+    to_hash = []
+    for path, (sha1, size) in files.items():
+        key = str(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            bad.append((path, "missing"))
+            journal.pop(key, None)
+            continue
+        if size is not None and st.st_size != size:
+            bad.append((path, f"size {st.st_size} != {size}"))
+            journal.pop(key, None)
+            continue
+        if sha1 is None:
+            continue
+        entry = journal.get(key)
+        if entry is None or entry[0] != sha1 or entry[1:] != _stamp(st):
+            to_hash.append((key, sha1))
+
+    batches = [to_hash[i:i + BATCH_SIZE] for i in range(0, len(to_hash), BATCH_SIZE)]
+    if len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [r for batch in pool.map(hash_files, batches) for r in batch]
+    else:
+        results = hash_files(to_hash)
+    sha1s = dict(to_hash)
+    for key, ok, stamp in results:
+        if ok:
+            journal[key] = [sha1s[key], *stamp]
+        else:
+            bad.append((Path(key), "sha1 mismatch" if stamp else "missing"))
+            journal.pop(key, None)
+    return files, bad, len(to_hash)
+
+
+def _discard(path, sha1, store_dir):
+    """
+    Removes a corrupt file, and its store blob when that is the same file or corrupt too
+    (the installer would link it right back otherwise).
+    """
+    if sha1 is not None:
+        blob = blob_path(store_dir, sha1)
+        try:
+            if blob.exists() and ((path.exists() and os.path.samefile(blob, path)) or sha1_file(blob) != sha1.lower()):
+                blob.unlink()
+        except OSError:
+            pass
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _needs_install(base_dir, version_id):
+    version_folder = Path(base_dir) / "versions" / version_id
+    return not all(p.exists() for p in (version_folder / f"{version_id}.json", version_folder / "natives",
+                                         version_folder / f"{version_id}.classpath.json"))
+
+
+def repair(version_ids, base_dir, manifest_url=MANIFEST_URL, workers=DEFAULT_WORKERS, segments=DEFAULT_SEGMENTS,
+           ttl=DEFAULT_TTL, offline=False, features=None, assets_base_url=ASSETS_BASE_URL, hash_workers=None):
+    """
+    Brings installed versions back to what their version JSON and asset index say, without
+    erasing anything that is fine: missing and corrupt files (see check_install) are removed
+    and fetched again with install_many, which also redoes the natives and launch manifest.
+    Nothing is downloaded when everything checks out. A version whose JSON is missing is
+    installed from scratch; one whose JSON can't be read (e.g. cut off by an interrupted
+    install) gets it back from the cache first, then is checked like the others.
+
+    Returns a report dict: versions, checked (files), hashed, bad [(path, reason)], fetched
+    (downloads scheduled), failures [(name, error)] and seconds.
+    """
+    start = time.perf_counter()
+    base_dir = Path(base_dir)
+    version_ids = list(dict.fromkeys(version_ids))
+    journal_path = base_dir / "cache" / "file_state.json"
+    journal = load_journal(journal_path)
+
+    restored = []
+    for version_id in version_ids:
+        json_path = base_dir / "versions" / version_id / f"{version_id}.json"
+        if json_path.exists() and not _readable_json(json_path):
+            version = find_version(version_id, base_dir / "cache", manifest_url, ttl, offline)
+            save_version_json(version, json_path, base_dir / "cache", offline=offline)
+            restored.append((json_path, "unreadable"))
+
+    files, bad, hashed = check_install(base_dir, version_ids, journal, hash_workers)
+    for path, _ in bad:
+        _discard(path, files[path][0], base_dir / "store")
+
+    fetched = 0
+    failures = []
+    if bad or any(_needs_install(base_dir, version_id) for version_id in version_ids):
+        report = install_many(version_ids, base_dir, manifest_url, workers, segments, ttl, offline, features,
+                              assets_base_url)
+        fetched = report["files"]
+        failures = report["failures"]
+        # Whatever landed was checked against its SHA-1 while downloading
+        for path, _ in bad:
+            sha1 = files[path][0]
+            if sha1 is not None:
+                try:
+                    journal[str(path)] = [sha1, *_stamp(os.stat(path))]
+                except OSError:
+                    pass
+    if bad or hashed:
+        save_journal(journal_path, journal)
+
+    return {
+        "versions": version_ids,
+        "checked": len(files),
+        "hashed": hashed,
+        "bad": restored + bad,
+        "fetched": fetched,
+        "failures": failures,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def print_repair_report(report):
+    for path, reason in report["bad"]:
+        print(f"Repairing {path} ({reason})")
+    print(f"Checked {report['checked']} files ({report['hashed']} hashed), {len(report['bad'])} missing or corrupt,"
+          f" {report['fetched']} fetched in {report['seconds']:.2f}s")
@@ -0,0 +1,114 @@
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+
+import metrics
+from downloader import download_file, download_resumable, is_complete
+
+# A blob in the store is referenced by the hardlinks pointing at it, so its link count
+# is its reference count: st_nlink == 1 means only the store itself still holds it.
+# Where a target can't be hardlinked (another device, or a filesystem without hardlinks)
+# it gets a copy and the blob keeps st_nlink == 1: the store is then only a download
+# cache, emptied by every gc_store.
+
+BLOB_NAME = re.compile(r"^[0-9a-f]{40}$")
+
+_locks_lock = threading.Lock()
+_blob_locks = {}  # blob path -> lock held while the blob is checked and downloaded
+
+
+def _blob_lock(blob):
+    with _locks_lock:
+        return _blob_locks.setdefault(str(blob), threading.Lock())
+
+
+def blob_path(store_dir, sha1):
+    sha1 = sha1.lower()
+    return Path(store_dir) / sha1[:2] / sha1
+
+
+def iter_blobs(store_dir):
+    """
+    os.DirEntry of every blob in store_dir. The partial files of downloads still running
+    (<sha1>.part..., .<sha1>...part) are not blobs and are left out.
+    """
+    store_dir = Path(store_dir)
+    if not store_dir.exists():
+        return
+    for shard in os.scandir(store_dir):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if BLOB_NAME.match(entry.name) and entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+def link_or_copy(blob, target):
+    """
+    Makes target the same file as blob: a hardlink when the filesystem allows it,
+    otherwise a copy. The target is replaced atomically.
+    """
+    target = Path(target)
+    try:
+        if os.path.samefile(blob, target):
+            return
+    except OSError:
+        pass
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.link")
+    if tmp.exists():
+        tmp.unlink()
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        # Different device, or a filesystem without hardlinks
+        shutil.copyfile(blob, tmp)
+    os.replace(tmp, target)
+
+
+def fetch_to_store(url, target, sha1=None, size=None, store_dir=None, segments=1):
+    """
+    Downloads url to target through the content-addressed store: the data is fetched once
+    into store_dir/<sha1[:2]>/<sha1> and target is linked to it. Files without a sha1
+    (or without a store) are downloaded straight to target.
+    Concurrent calls for the same blob download it once, the others wait and link to it.
+    """
+    if store_dir is None or sha1 is None:
+        if segments > 1:
+            download_resumable(url, target, sha1=sha1, size=size, segments=segments)
+        else:
+            download_file(url, target, sha1=sha1, size=size)
+        return
+    blob = blob_path(store_dir, sha1)
+    with _blob_lock(blob):
+        if is_complete(blob, size):
+            metrics.CACHE.inc(cache="store", result="hit")
+        else:
+            metrics.CACHE.inc(cache="store", result="miss")
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            if segments > 1:
+                download_resumable(url, blob, sha1=sha1, size=size, segments=segments)
+            else:
+                download_file(url, blob, sha1=sha1, size=size)
+    link_or_copy(blob, target)
+
+
+def gc_store(store_dir, dry_run=False):
+    """
+    Removes the blobs nothing links to anymore. Returns (blobs, bytes) removed
+    (or that would be removed with dry_run). Blobs that were only copied, never linked,
+    count as unused (see the note at the top).
+    """
+    removed = 0
+    freed = 0
+    for entry in iter_blobs(store_dir):
+        st = entry.stat()
+        if st.st_nlink > 1:
+            continue
+        if not dry_run:
+            os.unlink(entry.path)
+        removed += 1
+        freed += st.st_size
+    return removed, freed
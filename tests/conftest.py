@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+class FileServer:
+    """
+    A local stand-in for the download servers: serves `files` ({path: bytes}) on
+    127.0.0.1 with single Range requests, logs every request and can inject faults.
+
+    faults: {path: [status, ...]} statuses answered (and consumed) before the real file
+    ranges: False to ignore Range headers and always answer 200
+    delay: seconds every request takes
+    max_in_flight: answer 429 to requests beyond this many at once
+    """
+
+    def __init__(self, files=None):
+        self.files = dict(files or {})
+        self.faults = {}
+        self.ranges = True
+        self.delay = 0.0
+        self.max_in_flight = None
+        self.requests = []  # (path, Range header or None, status)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def hits(self, path):
+        return sum(1 for p, _, _ in self.requests if p == path)
+
+    def _reply(self, handler, status, body=b"", headers=()):
+        with self._lock:
+            self.requests.append((handler.path, handler.headers.get("Range"), status))
+        handler.send_response(status)
+        handler.send_header("Content-Length", str(len(body)))
+        for key, value in headers:
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _handle(self, handler):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            over = self.max_in_flight is not None and self.in_flight > self.max_in_flight
+            queued = self.faults.get(handler.path)
+            fault = queued.pop(0) if queued else None
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            if over:
+                return self._reply(handler, 429, b"slow down")
+            if fault is not None:
+                return self._reply(handler, fault, b"fault")
+            body = self.files.get(handler.path)
+            if body is None:
+                return self._reply(handler, 404)
+            match = re.match(r"^bytes=(\d+)-(\d*)$", handler.headers.get("Range") or "")
+            if match and self.ranges:
+                start = int(match.group(1))
+                end = min(int(match.group(2)), len(body) - 1) if match.group(2) else len(body) - 1
+                if start >= len(body):
+                    return self._reply(handler, 416, headers=[("Content-Range", f"bytes */{len(body)}")])
+                return self._reply(handler, 206, body[start:end + 1],
+                                   [("Content-Range", f"bytes {start}-{end}/{len(body)}")])
+            self._reply(handler, 200, body)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def add_version(server, version_id, assets=20, libraries=3, jar_size=50_000, shared_assets=()):
+    """
+    Adds a mock Mojang version to server (manifest, version JSON, asset index under
+    /idx, assets under /res, libraries under /lib, client jar under /client) and
+    returns the version JSON. shared_assets are asset bodies included as is, so
+    several versions can share them.
+    """
+    objects = {}
+    for i, data in enumerate(list(shared_assets) + [os.urandom(300) for _ in range(assets)]):
+        h = sha1(data)
+        server.files[f"/res/{h[:2]}/{h}"] = data
+        objects[f"minecraft/{version_id}/{i}"] = {"hash": h, "size": len(data)}
+    index = json.dumps({"objects": objects}).encode()
+    server.files[f"/idx/{version_id}.json"] = index
+    libs = []
+    for i in range(libraries):
+        data = f"library {i}".encode() * 100
+        path = f"org/example/l{i}/1.0/l{i}-1.0.jar"
+        server.files[f"/lib/{path}"] = data
+        libs.append({"name": f"org.example:l{i}:1.0", "downloads": {"artifact": {
+            "path": path, "url": f"{server.url}/lib/{path}", "sha1": sha1(data), "size": len(data)}}})
+    jar = os.urandom(jar_size)
+    server.files[f"/client/{version_id}.jar"] = jar
+    version_json = {
+        "id": version_id, "type": "release", "mainClass": "net.minecraft.client.main.Main",
+        "assetIndex": {"id": version_id, "url": f"{server.url}/idx/{version_id}.json", "sha1": sha1(index),
+                       "size": len(index)},
+        "downloads": {"client": {"url": f"{server.url}/client/{version_id}.jar", "sha1": sha1(jar), "size": len(jar)}},
+        "libraries": libs,
+        "arguments": {"game": ["--username", "${auth_player_name}"],
+                      "jvm": ["-Djava.library.path=${natives_directory}", "-cp", "${classpath}"]},
+    }
+    body = json.dumps(version_json).encode()
+    server.files[f"/v/{version_id}.json"] = body
+    manifest = json.loads(server.files.get("/manifest.json", b'{"latest": {}, "versions": []}'))
+    manifest["versions"].append({"id": version_id, "type": "release", "url": f"{server.url}/v/{version_id}.json",
+                                 "time": "2020-01-01T00:00:00+00:00", "releaseTime": "2020-01-01T00:00:00+00:00",
+                                 "sha1": sha1(body)})
+    server.files["/manifest.json"] = json.dumps(manifest).encode()
+    return version_json
+
+
+def install_kwargs(server):
+    return {"manifest_url": server.url + "/manifest.json", "assets_base_url": server.url + "/res"}
+
+
+@pytest.fixture
+def file_server():
+    servers = []
+
+    def start(files=None):
+        server = FileServer(files)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+from conftest import add_version, install_kwargs
+
+from installer import install
+
+
+def _assets(server, version_id):
+    """
+    {asset name: server path} of the assets of version_id.
+    """
+    index = json.loads(server.files[f"/idx/{version_id}.json"])
+    return {name: f"/res/{a['hash'][:2]}/{a['hash']}" for name, a in index["objects"].items()}
+
+
+def _local(base_dir, server_path):
+    return base_dir / "assets" / "objects" / server_path.split("/", 2)[2]
+
+
+def test_objects_land_in_hash_layout(file_server, tmp_path):
+    server = file_server()
+    add_version(server, "1.0", assets=40)
+
+    assert install("1.0", tmp_path, workers=8, **install_kwargs(server))["failures"] == []
+    for path in _assets(server, "1.0").values():
+        assert _local(tmp_path, path).read_bytes() == server.files[path]
+
+
+def test_downloads_run_concurrently(file_server, tmp_path):
+    server = file_server()
+    add_version(server, "1.0", assets=32)
+    server.delay = 0.02
+
+    assert install("1.0", tmp_path, workers=8, **install_kwargs(server))["failures"] == []
+    assert server.peak_in_flight > 1
+
+
+def test_existing_objects_are_skipped(file_server, tmp_path):
+    server = file_server()
+    add_version(server, "1.0", assets=40)
+    install("1.0", tmp_path, workers=8, **install_kwargs(server))
+    server.requests.clear()
+
+    assert install("1.0", tmp_path, workers=8, **install_kwargs(server))["failures"] == []
+    assert [p for p, _, _ in server.requests if p.startswith("/res/")] == []
+
+
+def test_truncated_object_is_downloaded_again(file_server, tmp_path):
+    server = file_server()
+    add_version(server, "1.0", assets=3)
+    path = next(iter(_assets(server, "1.0").values()))
+    local = _local(tmp_path, path)
+    local.parent.mkdir(parents=True)
+    local.write_bytes(b"short")
+
+    assert install("1.0", tmp_path, workers=2, **install_kwargs(server))["failures"] == []
+    assert local.read_bytes() == server.files[path]
+
+
+def test_failures_are_reported_not_raised(file_server, tmp_path):
+    server = file_server()
+    add_version(server, "1.0", assets=5)
+    name, path = next(iter(_assets(server, "1.0").items()))
+    del server.files[path]
+
+    failures = install("1.0", tmp_path, workers=4, **install_kwargs(server))["failures"]
+    assert [n for n, _ in failures] == [name]
+    assert not _local(tmp_path, path).exists()
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc/self/fd")
+def test_failed_downloads_leave_no_open_files(file_server, tmp_path):
+    server = file_server()
+    add_version(server, "1.0", assets=20)
+    for path in _assets(server, "1.0").values():
+        del server.files[path]
+    fds = len(os.listdir("/proc/self/fd"))
+
+    assert len(install("1.0", tmp_path, workers=4, **install_kwargs(server))["failures"]) == 20
+    assert len(os.listdir("/proc/self/fd")) < fds + 5
@@ -0,0 +1,48 @@
+from conftest import add_version, install_kwargs
+
+from cleanup import delete_version, sweep
+from installer import install
+
+
+def _install_with_stray_library(file_server, tmp_path):
+    server = file_server()
+    add_version(server, "A")
+    base_dir = tmp_path / "mc"
+    assert install("A", base_dir, **install_kwargs(server))["failures"] == []
+    stray = base_dir / "libraries" / "org" / "old" / "old.jar"
+    stray.parent.mkdir(parents=True)
+    stray.write_bytes(b"x" * 100)
+    return base_dir, stray
+
+
+def test_sweep_removes_unused_library(file_server, tmp_path):
+    base_dir, stray = _install_with_stray_library(file_server, tmp_path)
+
+    assert sweep(base_dir, dry_run=True)["libraries"] == (1, 100)
+    report = sweep(base_dir)
+    assert report["libraries"] == (1, 100)
+    assert report["skipped"] == []
+    assert not stray.exists()
+
+
+def test_version_without_json_keeps_everything(file_server, tmp_path):
+    base_dir, stray = _install_with_stray_library(file_server, tmp_path)
+    (base_dir / "versions" / "B").mkdir()
+
+    report = sweep(base_dir, dry_run=True)
+    assert report["skipped"] == ["B"]
+    assert report["libraries"] == report["objects"] == report["indexes"] == (0, 0)
+    sweep(base_dir)
+    assert stray.exists()
+
+
+def test_delete_version_with_other_unreadable_version(file_server, tmp_path):
+    base_dir, stray = _install_with_stray_library(file_server, tmp_path)
+    (base_dir / "versions" / "B").mkdir()
+    (base_dir / "versions" / "B" / "B.json").write_text("{not json")
+
+    report = delete_version(base_dir, "A")
+    assert report["skipped"] == ["B"]
+    assert not (base_dir / "versions" / "A").exists()
+    assert stray.exists()
+    assert any((base_dir / "assets" / "objects").rglob("*"))
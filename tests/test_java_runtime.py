@@ -0,0 +1,63 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from java_runtime import install_java_archive
+
+JAVA = b"#!/bin/sh\necho java\n"
+
+
+def _tar(members):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as t:
+        for name, data, mode in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = mode
+            t.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def _zip(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        for name, data, mode in members:
+            info = zipfile.ZipInfo(name)
+            info.external_attr = (0o100000 | mode) << 16
+            z.writestr(info, data)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("name, pack", [("java.tar.gz", _tar), ("java.zip", _zip)])
+def test_executable_bits_are_kept(file_server, tmp_path, name, pack):
+    server = file_server({f"/{name}": pack([("jdk/bin/java", JAVA, 0o755), ("jdk/release", b"x", 0o644)])})
+
+    install_java_archive(f"{server.url}/{name}", tmp_path / "runtime", tmp_path / name)
+    java = tmp_path / "runtime" / "jdk" / "bin" / "java"
+    assert java.read_bytes() == JAVA
+    assert os.access(java, os.X_OK)
+    assert not os.access(tmp_path / "runtime" / "jdk" / "release", os.X_OK)
+    assert not (tmp_path / name).exists()
+
+
+def test_tar_with_traversal_is_rejected_without_retries(file_server, tmp_path):
+    server = file_server({"/java.tar.gz": _tar([("jdk/bin/java", JAVA, 0o755), ("../../evil", b"x", 0o644)])})
+
+    with pytest.raises(tarfile.FilterError):
+        install_java_archive(server.url + "/java.tar.gz", tmp_path / "runtime", tmp_path / "java.tar.gz")
+    assert server.hits("/java.tar.gz") == 1
+    assert not (tmp_path / "evil").exists()
+    assert list((tmp_path / "runtime").iterdir()) == []
+
+
+def test_zip_with_traversal_is_rejected_and_removed(file_server, tmp_path):
+    server = file_server({"/java.zip": _zip([("jdk/bin/java", JAVA, 0o755), ("../../evil", b"x", 0o644)])})
+
+    with pytest.raises(ValueError):
+        install_java_archive(server.url + "/java.zip", tmp_path / "runtime", tmp_path / "java.zip")
+    assert not (tmp_path / "evil").exists()
+    assert not (tmp_path / "java.zip").exists()
+    assert list((tmp_path / "runtime").iterdir()) == []
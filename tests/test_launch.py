@@ -0,0 +1,56 @@
+import os
+import sys
+
+from conftest import add_version, install_kwargs
+
+import api
+from installer import install
+from orchestrator import run_instances
+
+# Stands in for java: exits 1 when a classpath entry or the natives folder can't be
+# found from its working directory
+FAKE_JAVA = f"""#!{sys.executable}
+import os, sys
+args = sys.argv[1:]
+missing = [p for p in args[args.index("-cp") + 1].split(os.pathsep) if not os.path.exists(p)]
+natives = [a.split("=", 1)[1] for a in args if a.startswith("-Djava.library.path=")]
+missing += [p for p in natives if not os.path.isdir(p)]
+print("cwd", os.getcwd())
+print("missing", missing)
+sys.exit(1 if missing else 0)
+"""
+
+
+def _fake_java(tmp_path):
+    java = tmp_path / "bin" / "java"
+    java.parent.mkdir()
+    java.write_text(FAKE_JAVA)
+    java.chmod(0o755)
+    return java
+
+
+def test_instances_launch_from_relative_base_dir(file_server, tmp_path, monkeypatch):
+    server = file_server()
+    add_version(server, "1.0")
+    monkeypatch.chdir(tmp_path)
+    assert install("1.0", "mc", **install_kwargs(server))["failures"] == []
+    java = _fake_java(tmp_path)
+
+    reports = run_instances([{"version": "1.0", "account": "bob"}, {"version": "1.0", "account": "alice"}], "mc",
+                            max_running=2, sample_interval=0.05, java_path=str(java))
+    for report in reports:
+        assert report["error"] is None
+        assert report["returncode"] == 0, report["tail"]
+        assert report["game_dir"].startswith(str(tmp_path / "mc" / "instances"))
+
+
+def test_launch_command_paths_are_absolute(file_server, tmp_path, monkeypatch):
+    server = file_server()
+    add_version(server, "1.0")
+    monkeypatch.chdir(tmp_path)
+    install("1.0", "mc", **install_kwargs(server))
+
+    cmd = api.launch_command("1.0", "bob", "mc", java_path="bin/java", game_dir="game", argfile=False)
+    assert cmd[0] == str(tmp_path / "bin" / "java")
+    classpath = cmd[cmd.index("-cp") + 1].split(os.pathsep)
+    assert classpath and all(os.path.isabs(p) for p in classpath)
@@ -0,0 +1,26 @@
+import json
+import os
+
+from conftest import add_version
+
+from manifest import load_manifest_index
+
+
+def test_index_is_kept_in_memory_until_the_manifest_changes(file_server, tmp_path):
+    server = file_server()
+    add_version(server, "1.0")
+    url = server.url + "/manifest.json"
+
+    index = load_manifest_index(tmp_path, url)
+    assert index.get("1.0")["id"] == "1.0"
+    assert load_manifest_index(tmp_path, url) is index
+    assert server.hits("/manifest.json") == 1
+
+    manifest_path = tmp_path / "version_manifest.json"
+    manifest = json.loads(manifest_path.read_bytes())
+    manifest["versions"].append(dict(manifest["versions"][0], id="2.0"))
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    os.utime(manifest_path, ns=(1, 1))
+    changed = load_manifest_index(tmp_path, url)
+    assert changed is not index
+    assert changed.get("2.0")["id"] == "2.0"
@@ -0,0 +1,50 @@
+import json
+import os
+import urllib.parse
+
+import pytest
+from conftest import sha1
+
+import cache_server
+import mirrors
+import rate_control
+from downloader import download_file, download_resumable
+
+DATA = os.urandom(100_000)
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    yield
+    mirrors.set_mirrors([])
+    rate_control.reset()
+
+
+def _corrupt_mirror(file_server, origin, path):
+    mirror = file_server({path: b"x" * len(DATA)})
+    mirrors.set_mirrors([{"url": mirror.url, "hosts": [urllib.parse.urlsplit(origin.url).netloc]}])
+    return mirror
+
+
+@pytest.mark.parametrize("download", [download_file, download_resumable])
+def test_mirror_with_bad_data_is_skipped_on_retry(file_server, tmp_path, download):
+    origin = file_server({"/client.jar": DATA})
+    mirror = _corrupt_mirror(file_server, origin, "/client.jar")
+    out = tmp_path / "client.jar"
+
+    download(origin.url + "/client.jar", out, sha1=sha1(DATA), size=len(DATA))
+    assert out.read_bytes() == DATA
+    assert mirror.hits("/client.jar") == 1
+    assert origin.hits("/client.jar") == 1
+    assert mirrors.scores()[mirror.url]["failures"] == 1
+
+
+def test_index_served_only_when_sha1_matches(tmp_path):
+    index = json.dumps({"objects": {}}).encode()
+    indexes = tmp_path / "assets" / "indexes"
+    indexes.mkdir(parents=True)
+    (indexes / "17.json").write_bytes(index)
+
+    found = cache_server.local_path(tmp_path, "piston-meta.mojang.com", f"v1/packages/{sha1(index)}/17.json")
+    assert found == (indexes / "17.json").resolve()
+    assert cache_server.local_path(tmp_path, "piston-meta.mojang.com", f"v1/packages/{'0' * 40}/17.json") is None
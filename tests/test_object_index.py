@@ -0,0 +1,53 @@
+import json
+import os
+
+from conftest import add_version, install_kwargs, sha1
+
+from downloader import missing_objects
+from installer import install
+from object_index import load_object_index
+
+
+def _put(objects_dir, data):
+    h = sha1(data)
+    (objects_dir / h[:2]).mkdir(parents=True, exist_ok=True)
+    (objects_dir / h[:2] / h).write_bytes(data)
+    return h
+
+
+def test_snapshot_flags_truncated_objects(tmp_path):
+    objects_dir = tmp_path / "objects"
+    good = os.urandom(1000)
+    bad = os.urandom(1000)
+    h_good = _put(objects_dir, good)
+    h_bad = sha1(bad)
+    (objects_dir / h_bad[:2]).mkdir(exist_ok=True)
+    (objects_dir / h_bad[:2] / h_bad).write_bytes(bad[:5])
+
+    present = load_object_index(objects_dir, tmp_path / "objects.index.json")
+    wanted = {h_good: ("good", 1000), h_bad: ("bad", 1000)}
+    assert missing_objects(wanted, objects_dir, present) == {h_bad: ("bad", 1000)}
+
+
+def test_persisted_index_picks_up_new_objects(tmp_path):
+    objects_dir = tmp_path / "objects"
+    index_path = tmp_path / "objects.index.json"
+    first = _put(objects_dir, b"first")
+    assert load_object_index(objects_dir, index_path) == {first: 5}
+
+    second = _put(objects_dir, b"second object")
+    assert load_object_index(objects_dir, index_path) == {first: 5, second: 13}
+
+
+def test_install_replaces_truncated_object(file_server, tmp_path):
+    server = file_server()
+    version = add_version(server, "1.0")
+    objects_dir = tmp_path / "mc" / "assets" / "objects"
+    index = server.files[version["assetIndex"]["url"][len(server.url):]]
+    h = next(iter(json.loads(index)["objects"].values()))["hash"]
+    (objects_dir / h[:2]).mkdir(parents=True)
+    (objects_dir / h[:2] / h).write_bytes(b"trunc")
+
+    report = install("1.0", tmp_path / "mc", **install_kwargs(server))
+    assert report["failures"] == []
+    assert (objects_dir / h[:2] / h).read_bytes() == server.files[f"/res/{h[:2]}/{h}"]
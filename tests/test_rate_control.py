@@ -0,0 +1,51 @@
+import urllib.parse
+
+import pytest
+from conftest import add_version, install_kwargs
+
+import rate_control
+from installer import install
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(rate_control, "BACKOFF_BASE", 0.001)
+    yield
+    rate_control.reset()
+
+
+def _asset_paths(server):
+    return sorted(path for path in server.files if path.startswith("/res/"))
+
+
+def test_throttling_and_flaky_files_only_fail_the_broken_one(file_server, tmp_path):
+    server = file_server()
+    add_version(server, "1.0", assets=60)
+    server.max_in_flight = 4
+    paths = _asset_paths(server)
+    for path in paths[1::5]:
+        server.faults[path] = [503]
+    server.faults[paths[0]] = [500] * 10
+
+    report = install("1.0", tmp_path / "mc", **install_kwargs(server))
+    assert [error.status for _, error in report["failures"]] == [500]
+    host = report["hosts"][urllib.parse.urlsplit(server.url).netloc]
+    assert host["throttled"] > 0
+    assert host["limit"] < rate_control.MAX_PER_HOST
+
+
+def test_second_install_starts_with_fresh_limits_and_budget(file_server, tmp_path):
+    server = file_server()
+    add_version(server, "1.0", assets=30)
+    add_version(server, "2.0", assets=30)
+    for path in _asset_paths(server):
+        server.faults[path] = [503] * 10
+
+    first = install("1.0", tmp_path / "mc", **install_kwargs(server))
+    assert len(first["failures"]) == 30
+
+    for path in _asset_paths(server):
+        server.faults[path] = [503]
+    second = install("2.0", tmp_path / "mc", **install_kwargs(server))
+    assert second["failures"] == []
+    assert second["hosts"][urllib.parse.urlsplit(server.url).netloc]["throttled"] == 30
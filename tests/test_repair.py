@@ -0,0 +1,30 @@
+from conftest import add_version, install_kwargs
+
+from installer import install
+from repair import repair
+
+
+def test_corrupt_files_are_fetched_again_and_healthy_ones_not_rehashed(file_server, tmp_path):
+    server = file_server()
+    version = add_version(server, "1.0")
+    base_dir = tmp_path / "mc"
+    assert install("1.0", base_dir, **install_kwargs(server))["failures"] == []
+
+    asset = next(p for p in (base_dir / "assets" / "objects").rglob("*") if p.is_file())
+    asset.write_bytes(b"short")
+    library = base_dir / "libraries" / version["libraries"][0]["downloads"]["artifact"]["path"]
+    library.write_bytes(b"x" * library.stat().st_size)
+    json_path = base_dir / "versions" / "1.0" / "1.0.json"
+    json_path.write_bytes(json_path.read_bytes()[:100])
+
+    report = repair(["1.0"], base_dir, **install_kwargs(server))
+    assert sorted(reason for _, reason in report["bad"]) == ["sha1 mismatch", "size 5 != 300", "unreadable"]
+    assert report["failures"] == []
+    assert asset.read_bytes() == server.files[f"/res/{asset.name[:2]}/{asset.name}"]
+    assert library.read_bytes() == server.files["/lib/" + version["libraries"][0]["downloads"]["artifact"]["path"]]
+    assert json_path.read_bytes() == server.files["/v/1.0.json"]
+
+    server.requests.clear()
+    again = repair(["1.0"], base_dir, **install_kwargs(server))
+    assert (again["bad"], again["hashed"], again["fetched"]) == ([], 0, 0)
+    assert server.requests == []
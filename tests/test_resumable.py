@@ -0,0 +1,81 @@
+import os
+
+import pytest
+from conftest import sha1
+
+import downloader
+from downloader import ChecksumError, download_resumable
+
+DATA = os.urandom(200_000)
+
+
+def test_resumes_after_existing_prefix(file_server, tmp_path):
+    server = file_server({"/java.zip": DATA})
+    out = tmp_path / "java.zip"
+    (tmp_path / "java.zip.part").write_bytes(DATA[:50_000])
+
+    download_resumable(server.url + "/java.zip", out, sha1=sha1(DATA), size=len(DATA))
+    assert out.read_bytes() == DATA
+    assert server.requests == [("/java.zip", "bytes=50000-", 206)]
+    assert not (tmp_path / "java.zip.part").exists()
+
+
+def test_server_ignoring_range_starts_over(file_server, tmp_path):
+    server = file_server({"/java.zip": DATA})
+    server.ranges = False
+    out = tmp_path / "java.zip"
+    (tmp_path / "java.zip.part").write_bytes(DATA[:50_000])
+
+    download_resumable(server.url + "/java.zip", out, sha1=sha1(DATA), size=len(DATA))
+    assert out.read_bytes() == DATA
+    assert [status for _, _, status in server.requests] == [200]
+
+
+def test_complete_part_file_gets_416_and_is_used(file_server, tmp_path):
+    server = file_server({"/java.zip": DATA})
+    out = tmp_path / "java.zip"
+    (tmp_path / "java.zip.part").write_bytes(DATA)
+
+    download_resumable(server.url + "/java.zip", out, sha1=sha1(DATA))
+    assert out.read_bytes() == DATA
+    assert [status for _, _, status in server.requests] == [416]
+
+
+def test_segmented_download(file_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(downloader, "MIN_SEGMENT_SIZE", 16_000)
+    server = file_server({"/client.jar": DATA})
+    out = tmp_path / "client.jar"
+
+    download_resumable(server.url + "/client.jar", out, sha1=sha1(DATA), size=len(DATA), segments=4)
+    assert out.read_bytes() == DATA
+    ranges = sorted(r for _, r, _ in server.requests)
+    assert ranges == ["bytes=0-49999", "bytes=100000-149999", "bytes=150000-199999", "bytes=50000-99999"]
+    assert list(tmp_path.iterdir()) == [out]
+
+
+def test_corrupt_part_is_dropped_and_refetched(file_server, tmp_path):
+    server = file_server({"/java.zip": DATA})
+    out = tmp_path / "java.zip"
+    (tmp_path / "java.zip.part").write_bytes(b"x" * 50_000)
+
+    download_resumable(server.url + "/java.zip", out, sha1=sha1(DATA), size=len(DATA))
+    assert out.read_bytes() == DATA
+
+
+def test_bad_checksum_raises(file_server, tmp_path):
+    server = file_server({"/java.zip": DATA})
+    with pytest.raises(ChecksumError):
+        download_resumable(server.url + "/java.zip", tmp_path / "java.zip", sha1="0" * 40, retries=0)
+    assert not (tmp_path / "java.zip").exists()
+
+
+def test_segments_fall_back_to_one_stream_without_range_support(file_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(downloader, "MIN_SEGMENT_SIZE", 16_000)
+    server = file_server({"/client.jar": DATA})
+    server.ranges = False
+    out = tmp_path / "client.jar"
+
+    download_resumable(server.url + "/client.jar", out, sha1=sha1(DATA), size=len(DATA), segments=4, retries=0)
+    assert out.read_bytes() == DATA
+    assert server.hits("/client.jar") <= 5
+    assert list(tmp_path.iterdir()) == [out]
@@ -0,0 +1,60 @@
+import os
+import threading
+
+from conftest import sha1
+
+from store import blob_path, fetch_to_store, gc_store
+
+DATA = os.urandom(100_000)
+
+
+def test_concurrent_fetches_of_one_blob_download_once(file_server, tmp_path):
+    server = file_server({"/client.jar": DATA})
+    server.delay = 0.1
+    store_dir = tmp_path / "store"
+    targets = [tmp_path / "versions" / v / f"{v}.jar" for v in ("1.0", "1.1", "1.2")]
+    for target in targets:
+        target.parent.mkdir(parents=True)
+
+    threads = [threading.Thread(target=fetch_to_store,
+                                args=(server.url + "/client.jar", target, sha1(DATA), len(DATA), store_dir))
+               for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    blob = blob_path(store_dir, sha1(DATA))
+    assert server.hits("/client.jar") == 1
+    assert blob.stat().st_nlink == 1 + len(targets)
+    for target in targets:
+        assert os.path.samefile(target, blob)
+
+
+def test_existing_blob_is_linked_without_download(file_server, tmp_path):
+    server = file_server({"/client.jar": DATA})
+    store_dir = tmp_path / "store"
+    fetch_to_store(server.url + "/client.jar", tmp_path / "a.jar", sha1(DATA), len(DATA), store_dir)
+    fetch_to_store(server.url + "/client.jar", tmp_path / "b.jar", sha1(DATA), len(DATA), store_dir)
+
+    assert server.hits("/client.jar") == 1
+    assert os.path.samefile(tmp_path / "a.jar", tmp_path / "b.jar")
+
+
+def test_gc_keeps_linked_blobs_and_partial_downloads(tmp_path):
+    store_dir = tmp_path / "store"
+    unused = blob_path(store_dir, sha1(b"unused"))
+    linked = blob_path(store_dir, sha1(DATA))
+    for blob, data in ((unused, b"unused"), (linked, DATA)):
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        blob.write_bytes(data)
+    os.link(linked, tmp_path / "client.jar")
+    partials = [linked.with_name(linked.name + suffix) for suffix in (".part", ".part.0")]
+    for part in partials:
+        part.write_bytes(b"in progress")
+
+    assert gc_store(store_dir, dry_run=True) == (1, 6)
+    assert gc_store(store_dir) == (1, 6)
+    assert not unused.exists()
+    assert linked.exists()
+    assert all(part.exists() for part in partials)
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from asset_index import load_asset_index
+from libraries import resolve_libraries
+
+# ---------------- CONFIG ----------------
+BATCH_SIZE = 256  # files handed to a worker process at once
+READ_SIZE = 1024 * 1024
+# ----------------------------------------
+
+
+def sha1_file(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(READ_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def collect_install_files(base_dir, exclude=(), version_ids=None):
+    """
+    Lists every file an installation under base_dir (the "mc" folder) should contain,
+    as {path: (sha1, size)}, from the installed version JSONs and their asset indexes.
+    sha1/size are None when the JSON does not carry them. Version ids in exclude are
+    skipped; with version_ids only those versions are listed. Versions without a readable
+    JSON are skipped too.
+    """
+    base_dir = Path(base_dir)
+    versions_dir = base_dir / "versions"
+    libraries_dir = base_dir / "libraries"
+    indexes_dir = base_dir / "assets" / "indexes"
+    objects_dir = base_dir / "assets" / "objects"
+    files = {}
+    if not versions_dir.exists():
+        return files
+    for version_folder in versions_dir.iterdir():
+        if version_folder.name in exclude or (version_ids is not None and version_folder.name not in version_ids):
+            continue
+        try:
+            with open(version_folder / f"{version_folder.name}.json", encoding="utf-8") as f:
+                json_data = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        client = json_data.get("downloads", {}).get("client")
+        if client:
+            files[version_folder / f"{version_folder.name}.jar"] = (client.get("sha1"), client.get("size"))
+
+        for lib in resolve_libraries(json_data, libraries_dir):
+            files[lib["path"]] = (lib["sha1"], lib["size"])
+
+        asset_index = json_data.get("assetIndex")
+        if not asset_index:
+            continue
+        index_path = indexes_dir / f"{asset_index['id']}.json"
+        files[index_path] = (asset_index.get("sha1"), asset_index.get("size"))
+        if not index_path.exists():
+            continue
+        index = load_asset_index(index_path, base_dir / "cache" / "asset_indexes")
+        for asset_hash, size in zip(index.hashes(), index.sizes):
+            files[objects_dir / asset_hash[:2] / asset_hash] = (asset_hash, size)
+    return files
+
+
+def check_files(entries):
+    """
+    Checks a batch of (path, sha1, size) entries.
+    Returns (problems, bytes_read) where problems is a list of (path, reason).
+    """
+    problems = []
+    bytes_read = 0
+    for path, sha1, size in entries:
+        try:
+            st = os.stat(path)
+        except OSError:
+            problems.append((path, "missing"))
+            continue
+        if size is not None and st.st_size != size:
+            problems.append((path, f"size {st.st_size} != {size}"))
+            continue
+        if sha1 is None:
+            continue
+        bytes_read += st.st_size
+        if sha1_file(path) != sha1.lower():
+            problems.append((path, "sha1 mismatch"))
+    return problems, bytes_read
+
+
+def verify_installation(base_dir, workers=None):
+    """
+    Hashes every file of the installation with a process pool.
+    Returns a report dict: files, bytes, seconds, mb_per_s, files_per_s and problems.
+    """
+    files = collect_install_files(base_dir)
+    entries = [(str(path), sha1, size) for path, (sha1, size) in files.items()]
+    batches = [entries[i:i + BATCH_SIZE] for i in range(0, len(entries), BATCH_SIZE)]
+
+    start = time.perf_counter()
+    problems = []
+    total_bytes = 0
+    if batches:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for batch_problems, batch_bytes in pool.map(check_files, batches):
+                problems.extend(batch_problems)
+                total_bytes += batch_bytes
+    seconds = time.perf_counter() - start
+
+    return {
+        "files": len(entries),
+        "bytes": total_bytes,
+        "seconds": seconds,
+        "mb_per_s": total_bytes / 1024 / 1024 / seconds if seconds else 0.0,
+        "files_per_s": len(entries) / seconds if seconds else 0.0,
+        "problems": problems,
+    }
+
+
+def print_report(report):
+    for path, reason in report["problems"]:
+        print(f"BAD: {path} ({reason})")
+    print(f"Checked {report['files']} files ({report['bytes'] / 1024 / 1024:.1f} MB) in {report['seconds']:.2f}s"
+          f" -- {report['mb_per_s']:.1f} MB/s, {report['files_per_s']:.0f} files/s")
+    if report["problems"]:
+        print(f"{len(report['problems'])} file(s) are missing or corrupt")
+    else:
+        print("All files OK")